@@ -1,19 +1,337 @@
+import multiprocessing as mp
+import pickle
+import tempfile
 import typing as tp
+from collections import Counter
 
 from . import operations as ops
 from . import external_sort as ext_sort
 
+# spool files with output of shared operation prefixes, None if rows can't be pickled
+_TSpools = dict[tuple[int, ...], tp.IO[bytes] | None]
+
+# built-in mappers whose columns are known; subclasses may read and write any columns,
+# so they are matched by exact type
+_KNOWN_MAPPERS: frozenset[type[ops.Mapper]] = frozenset(
+    {
+        ops.DummyMapper,
+        ops.Division,
+        ops.Logarithm,
+        ops.FilterPunctuation,
+        ops.LowerCase,
+        ops.Split,
+        ops.Product,
+        ops.Filter,
+        ops.Project,
+        ops.Rename,
+        ops.Haversine,
+        ops.Hour,
+        ops.Weekday,
+        ops.ToCalendarWeekday,
+        ops.TimeDifference,
+        ops.Normalize,
+    }
+)
+_KNOWN_REDUCERS: frozenset[type[ops.Reducer]] = frozenset(
+    {ops.FirstReducer, ops.TopN, ops.TermFrequency, ops.Count, ops.Sum}
+)
+_KNOWN_JOINERS: frozenset[type[ops.Joiner]] = frozenset(
+    {ops.InnerJoiner, ops.OuterJoiner, ops.LeftJoiner, ops.RightJoiner}
+)
+_KNOWN_OPERATIONS: frozenset[type[ops.Operation]] = frozenset(
+    {
+        ops.Map,
+        ops.BatchMap,
+        ops.ParallelMap,
+        ops.Reduce,
+        ops.HashReduce,
+        ext_sort.ExternalSort,
+    }
+)
+
+
+def _written_columns(mapper: ops.Mapper) -> set[str] | None:
+    """Columns which mapper may change or add, None if mapper may change row order
+    or is not known
+    :param mapper: mapper to inspect
+    """
+    if type(mapper) not in _KNOWN_MAPPERS:
+        return None
+    if isinstance(mapper, ops.Filter | ops.Project):
+        return set()
+    if isinstance(mapper, ops.Rename):
+        return {mapper.column, mapper.new_column}
+    if isinstance(mapper, ops.Division | ops.Logarithm | ops.Product | ops.Haversine):
+        return {mapper.result_column}
+    if isinstance(mapper, ops.Normalize):
+        return {mapper.column}
+    return None
+
+
+def _mapped_sort_order(
+    sort_order: tuple[str, ...] | None, mapper: ops.Mapper
+) -> tuple[str, ...] | None:
+    """Longest prefix of sort order which is still valid after the mapper
+    :param sort_order: sort order of mapper input
+    :param mapper: mapper to apply
+    """
+    if type(mapper) is ops.ComposedMapper:
+        for inner_mapper in mapper.mappers:
+            sort_order = _mapped_sort_order(sort_order, inner_mapper)
+        return sort_order
+    written_columns = _written_columns(mapper)
+    if sort_order is None or written_columns is None:
+        return None
+    if isinstance(mapper, ops.Project):
+        written_columns = set(sort_order) - set(mapper.columns)
+    for i, column in enumerate(sort_order):
+        if column in written_columns:
+            return sort_order[:i] or None
+    return sort_order
+
+
+def _read_columns(mapper: ops.Mapper) -> set[str] | None:
+    """Columns which mapper reads, None if they are not known
+    :param mapper: mapper to inspect
+    """
+    if type(mapper) not in _KNOWN_MAPPERS:
+        return None
+    if isinstance(mapper, ops.DummyMapper):
+        return set()
+    if isinstance(
+        mapper,
+        ops.Rename
+        | ops.Logarithm
+        | ops.FilterPunctuation
+        | ops.LowerCase
+        | ops.Split
+        | ops.Hour
+        | ops.Weekday
+        | ops.ToCalendarWeekday
+        | ops.Normalize,
+    ):
+        return {mapper.column}
+    if isinstance(mapper, ops.Division):
+        return {mapper.column_num, mapper.column_den}
+    if isinstance(mapper, ops.Product):
+        return set(mapper.columns)
+    if isinstance(mapper, ops.Haversine):
+        return {mapper.a_column, mapper.b_column}
+    if isinstance(mapper, ops.TimeDifference):
+        return {mapper.start_column, mapper.end_column}
+    return None
+
+
+def _mapper_input_columns(
+    columns: set[str] | None, mapper: ops.Mapper
+) -> set[str] | None:
+    """Columns of mapper input which are needed to compute the needed output columns
+    :param columns: needed output columns, None if all of them
+    :param mapper: mapper to apply
+    """
+    if type(mapper) is ops.ComposedMapper:
+        for inner_mapper in reversed(mapper.mappers):
+            columns = _mapper_input_columns(columns, inner_mapper)
+        return columns
+    if type(mapper) is ops.Project:
+        return set(mapper.columns) if columns is None else set(mapper.columns) & columns
+    read_columns = _read_columns(mapper)
+    if columns is None or read_columns is None:
+        return None
+    return columns | read_columns
+
+
+def _reducer_input_columns(
+    columns: set[str] | None, reducer: ops.Reducer, keys: tp.Sequence[str]
+) -> set[str] | None:
+    """Columns of reducer input which are needed to compute the needed output columns
+    :param columns: needed output columns, None if all of them
+    :param reducer: reducer to apply
+    :param keys: keys for grouping
+    """
+    if type(reducer) not in _KNOWN_REDUCERS:
+        return None
+    if isinstance(reducer, ops.Count):
+        return set(keys)
+    if isinstance(reducer, ops.Sum):
+        return {*keys, reducer.column}
+    if isinstance(reducer, ops.TermFrequency):
+        return {*keys, reducer.words_column}
+    if columns is None:
+        return None
+    if isinstance(reducer, ops.FirstReducer):
+        return columns | set(keys)
+    if isinstance(reducer, ops.TopN):
+        return columns | {*keys, reducer.column_max}
+    return None
+
+
+def _joined_columns(columns: set[str] | None, join: ops.Join) -> set[str] | None:
+    """Columns of both join inputs which are needed to compute the needed output columns
+    Columns which got a suffix because of the name clash are kept on both sides,
+    so that the clash and the suffixes remain the same
+    :param columns: needed output columns, None if all of them
+    :param join: join to apply
+    """
+    joiner = join.joiner
+    if (
+        columns is None
+        or type(join) is not ops.Join
+        or type(joiner) not in _KNOWN_JOINERS
+    ):
+        return None
+    clashed_columns = {
+        column[: -len(suffix)]
+        for column in columns
+        for suffix in (joiner._a_suffix, joiner._b_suffix)
+        if suffix and column.endswith(suffix)
+    }
+    return columns | clashed_columns | set(join.keys)
+
+
+def _input_columns(
+    columns: set[str] | None, operation: ops.Operation
+) -> set[str] | None:
+    """Columns of operation input which are needed to compute the needed output columns
+    :param columns: needed output columns, None if all of them
+    :param operation: operation to apply
+    """
+    if type(operation) not in _KNOWN_OPERATIONS:
+        return None
+    if isinstance(operation, ops.Map | ops.BatchMap | ops.ParallelMap):
+        return _mapper_input_columns(columns, operation.mapper)
+    if isinstance(operation, ops.Reduce | ops.HashReduce):
+        return _reducer_input_columns(columns, operation.reducer, operation.keys)
+    if isinstance(operation, ext_sort.ExternalSort):
+        return None if columns is None else columns | set(operation.keys)
+    return None
+
+
+def _mapper_output_columns(
+    columns: set[str] | None, mapper: ops.Mapper
+) -> set[str] | None:
+    """Columns which rows may have after the mapper
+    :param columns: columns which rows may have before the mapper, None if not known
+    :param mapper: mapper to apply
+    """
+    if type(mapper) is ops.ComposedMapper:
+        for inner_mapper in mapper.mappers:
+            columns = _mapper_output_columns(columns, inner_mapper)
+        return columns
+    if type(mapper) is ops.Project:
+        return set(mapper.columns) if columns is None else set(mapper.columns) & columns
+    if columns is None or type(mapper) not in _KNOWN_MAPPERS:
+        return None
+    if isinstance(
+        mapper,
+        ops.DummyMapper
+        | ops.Filter
+        | ops.FilterPunctuation
+        | ops.LowerCase
+        | ops.Split
+        | ops.ToCalendarWeekday
+        | ops.Normalize,
+    ):
+        return columns
+    if isinstance(mapper, ops.Rename):
+        return columns | {mapper.new_column}
+    if isinstance(
+        mapper,
+        ops.Division
+        | ops.Logarithm
+        | ops.Product
+        | ops.Haversine
+        | ops.Hour
+        | ops.Weekday
+        | ops.TimeDifference,
+    ):
+        return columns | {mapper.result_column}
+    return None
+
+
+def _output_columns(
+    columns: set[str] | None, operation: ops.Operation
+) -> set[str] | None:
+    """Columns which rows may have after the operation
+    :param columns: columns which rows may have before the operation, None if not known
+    :param operation: operation to apply
+    """
+    if type(operation) is ops.Read or type(operation) is ops.ReadIterFactory:
+        return None if operation.columns is None else set(operation.columns)
+    if type(operation) not in _KNOWN_OPERATIONS:
+        return None
+    if isinstance(operation, ops.Map | ops.BatchMap | ops.ParallelMap):
+        return _mapper_output_columns(columns, operation.mapper)
+    if isinstance(operation, ops.Reduce | ops.HashReduce):
+        reducer = operation.reducer
+        if type(reducer) not in _KNOWN_REDUCERS:
+            return None
+        if isinstance(reducer, ops.Count | ops.Sum):
+            return {*operation.keys, reducer.column}
+        if isinstance(reducer, ops.TermFrequency):
+            return {*operation.keys, reducer.words_column, reducer.result_column}
+        if isinstance(reducer, ops.FirstReducer | ops.TopN):
+            return columns
+        return None
+    if isinstance(operation, ext_sort.ExternalSort):
+        return columns
+    return None
+
+
+def _is_expensive(operation: ops.Operation) -> bool:
+    """Check whether operation output is worth spooling to share it between branches
+    :param operation: operation to inspect
+    """
+    return isinstance(
+        operation, ext_sort.ExternalSort | ops.Reduce | ops.HashReduce | ops.Join
+    )
+
+
+def _projected(
+    operation: ops.Operation, columns: set[str], available_columns: set[str] | None
+) -> list[ops.Operation]:
+    """Operations which replace the operation so that only needed columns are kept:
+    sources read only needed columns, sorts get only needed columns
+    :param operation: operation to replace
+    :param columns: columns needed at the operation
+    :param available_columns: columns which input rows may have, None if not known
+    """
+    # subclasses of sources may override how rows are read, so they are kept as is
+    if type(operation) is ops.Read:
+        if operation.columns is not None:
+            columns = columns & set(operation.columns)
+        return [
+            ops.Read(
+                operation.filename,
+                operation.parser,
+                operation.buffer_size,
+                columns=sorted(columns),
+            )
+        ]
+    if type(operation) is ops.ReadIterFactory:
+        if operation.columns is not None:
+            columns = columns & set(operation.columns)
+        return [ops.ReadIterFactory(operation.name, columns=sorted(columns))]
+    if isinstance(operation, ext_sort.ExternalSort) and not (
+        available_columns is not None and available_columns <= columns
+    ):
+        return [ops.Map(ops.Project(sorted(columns))), operation]
+    return [operation]
+
 
 class Graph:
     """Computational graph implementation"""
 
     def __init__(
         self,
-        operations: list[ops.Operation] | None = None,
-        join_graphs: list["Graph"] | None = None,
+        operations: tp.Sequence[ops.Operation] | None = None,
+        join_graphs: tp.Sequence["Graph"] | None = None,
+        sort_order: tuple[str, ...] | None = None,
     ) -> None:
-        self._operations = operations or []
-        self._join_graphs = join_graphs or []
+        self._operations: tuple[ops.Operation, ...] = tuple(operations or ())
+        self._join_graphs: tuple["Graph", ...] = tuple(join_graphs or ())
+        self._sort_order = sort_order
+        self._plan: tuple["Graph", frozenset[tuple[int, ...]]] | None = None
 
     @staticmethod
     def graph_from_iter(name: str) -> "Graph":
@@ -22,7 +340,7 @@ class Graph:
         Use ops.ReadIterFactory
         :param name: name of kwarg to use as data source
         """
-        return Graph(operations=[ops.ReadIterFactory(name)])
+        return Graph(operations=(ops.ReadIterFactory(name),))
 
     @staticmethod
     def graph_from_file(filename: str, parser: tp.Callable[[str], ops.TRow]) -> "Graph":
@@ -31,15 +349,63 @@ class Graph:
         :param filename: filename to read from
         :param parser: parser from string to Row
         """
-        return Graph(operations=[ops.Read(filename, parser)])
+        return Graph(operations=(ops.Read(filename, parser),))
 
     def map(self, mapper: ops.Mapper) -> "Graph":
         """Construct new graph extended with map operation with particular mapper
+        Consecutive map operations are fused into a single one,
+        batch mappers are applied to batches of rows
         :param mapper: mapper to use
         """
+        sort_order = _mapped_sort_order(self._sort_order, mapper)
+        if isinstance(mapper, ops.BatchMapper):
+            return Graph(
+                operations=self._operations + (ops.BatchMap(mapper),),
+                join_graphs=self._join_graphs,
+                sort_order=sort_order,
+            )
+        if self._operations and isinstance(self._operations[-1], ops.Map):
+            fused_mapper = ops.ComposedMapper([self._operations[-1].mapper, mapper])
+            return Graph(
+                operations=self._operations[:-1] + (ops.Map(fused_mapper),),
+                join_graphs=self._join_graphs,
+                sort_order=sort_order,
+            )
+        if self._operations and isinstance(self._operations[-1], ops.ParallelMap):
+            parallel_map = self._operations[-1]
+            fused_mapper = ops.ComposedMapper([parallel_map.mapper, mapper])
+            return Graph(
+                operations=self._operations[:-1]
+                + (
+                    ops.ParallelMap(
+                        fused_mapper, parallel_map.chunk_size, parallel_map.workers
+                    ),
+                ),
+                join_graphs=self._join_graphs,
+                sort_order=sort_order,
+            )
         return Graph(
-            operations=[*self._operations, ops.Map(mapper)],
-            join_graphs=[*self._join_graphs],
+            operations=self._operations + (ops.Map(mapper),),
+            join_graphs=self._join_graphs,
+            sort_order=sort_order,
+        )
+
+    def map_parallel(
+        self, mapper: ops.Mapper, workers: int | None = None, chunk_size: int = 10_000
+    ) -> "Graph":
+        """Construct new graph extended with map operation which is run in a pool
+        of processes; following map operations are fused into it
+        Worth it for mappers which spend much more time on a row than it takes
+        to send the row to another process
+        :param mapper: mapper to use
+        :param workers: number of worker processes, number of CPUs if None
+        :param chunk_size: number of rows sent to a worker at once
+        """
+        return Graph(
+            operations=self._operations
+            + (ops.ParallelMap(mapper, chunk_size, workers),),
+            join_graphs=self._join_graphs,
+            sort_order=_mapped_sort_order(self._sort_order, mapper),
         )
 
     def reduce(self, reducer: ops.Reducer, keys: tp.Sequence[str]) -> "Graph":
@@ -48,17 +414,40 @@ class Graph:
         :param keys: keys for grouping
         """
         return Graph(
-            operations=[*self._operations, ops.Reduce(reducer, keys)],
-            join_graphs=[*self._join_graphs],
+            operations=self._operations + (ops.Reduce(reducer, keys),),
+            join_graphs=self._join_graphs,
+            sort_order=tuple(keys) if self._is_sorted_by(keys) else None,
+        )
+
+    def reduce_hash(
+        self, reducer: ops.Reducer, keys: tp.Sequence[str], max_rows: int = 100_000
+    ) -> "Graph":
+        """Construct new graph extended with reduce operation which groups rows in memory
+        Input does not have to be sorted; large inputs fall back to external sort
+        :param reducer: reducer to use
+        :param keys: keys for grouping
+        :param max_rows: number of rows to group in memory before falling back to sort
+        """
+        hash_reduce = ops.HashReduce(
+            reducer, keys, max_rows=max_rows, fallback_sort=ext_sort.ExternalSort(keys)
+        )
+        return Graph(
+            operations=self._operations + (hash_reduce,),
+            join_graphs=self._join_graphs,
+            sort_order=tuple(keys) or None,
         )
 
     def sort(self, keys: tp.Sequence[str]) -> "Graph":
         """Construct new graph extended with sort operation
+        Graph which is already sorted by these keys is returned as is
         :param keys: sorting keys (typical is tuple of strings)
         """
+        if self._is_sorted_by(keys):
+            return self
         return Graph(
-            operations=[*self._operations, ext_sort.ExternalSort(keys)],
-            join_graphs=[*self._join_graphs],
+            operations=self._operations + (ext_sort.ExternalSort(keys),),
+            join_graphs=self._join_graphs,
+            sort_order=tuple(keys) or None,
         )
 
     def join(
@@ -70,16 +459,247 @@ class Graph:
         :param keys: keys for grouping
         """
         return Graph(
-            operations=[*self._operations, ops.Join(joiner, keys)],
-            join_graphs=[*self._join_graphs, join_graph],
+            operations=self._operations + (ops.Join(joiner, keys),),
+            join_graphs=self._join_graphs + (join_graph,),
+            sort_order=tuple(keys) if self._is_sorted_by(keys) else None,
+        )
+
+    def _is_sorted_by(self, keys: tp.Sequence[str]) -> bool:
+        """Check whether graph output is known to be sorted by keys
+        :param keys: sorting keys
+        """
+        return (
+            len(keys) > 0
+            and self._sort_order is not None
+            and self._sort_order[: len(keys)] == tuple(keys)
         )
 
     def run(self, **kwargs: tp.Any) -> ops.TRowsIterable:
-        """Single method to start execution; data sources passed as kwargs"""
+        """Single method to start execution; data sources passed as kwargs
+        Sorts, reduces and joins shared by several branches of the graph are executed
+        only once, unless their output rows can't be pickled
+        """
+        graph, shared_prefixes = self._compile()
+        return graph._execute(len(graph._operations), kwargs, set(shared_prefixes), {})
+
+    def run_parallel(self, **kwargs: tp.Any) -> ops.TRowsIterable:
+        """Start execution like run, but compute every graph joined into this one
+        in a separate process; data sources passed as kwargs
+        Operations shared by several branches are executed once before the branches
+        are started, so processes only do the work which is specific to them.
+        Rows of joined graphs are passed between processes, so they have to be picklable.
+        Falls back to run on platforms which do not support fork
+        """
+        if not self._join_graphs or "fork" not in mp.get_all_start_methods():
+            return self.run(**kwargs)
+        graph, shared_prefixes = self._compile()
+        return graph._run_parallel(kwargs, set(shared_prefixes))
 
-        join_graphs_cnt: int = 0
-        data: ops.TRowsGenerator | None = None
+    def _compile(self) -> tuple["Graph", frozenset[tuple[int, ...]]]:
+        """Optimized graph and its shared operation prefixes
+        Graph is not changed after construction, so they are computed on the first run
+        and reused by the following ones
+        """
+        if self._plan is None:
+            graph = self._optimize()
+            self._plan = (graph, frozenset(graph._shared_prefixes()))
+        return self._plan
+
+    def _optimize(self) -> "Graph":
+        """Copy of the graph where columns which are not used downstream are dropped
+        when rows are read and before every sort, so that less data is copied
+        and spilled to disk
+        """
+        needed_columns: dict[int, set[str] | None] = {}
+        self._collect_needed_columns(None, needed_columns)
+        return self._with_projections(needed_columns, {})
+
+    def _collect_needed_columns(
+        self,
+        columns: set[str] | None,
+        needed_columns: dict[int, set[str] | None],
+    ) -> None:
+        """Find columns which are needed from every source and at every sort of the graph
+        Operation shared by several branches keeps columns needed by any of them
+        :param columns: needed output columns, None if all of them
+        :param needed_columns: needed columns by id of operation
+        """
+        join_graphs = reversed(self._join_graphs)
+        for operation in reversed(self._operations):
+            if isinstance(operation, ops.Join):
+                columns = _joined_columns(columns, operation)
+                next(join_graphs)._collect_needed_columns(columns, needed_columns)
+                continue
+            if isinstance(operation, ext_sort.ExternalSort):
+                columns = _input_columns(columns, operation)
+            elif not isinstance(operation, ops.Read | ops.ReadIterFactory):
+                columns = _input_columns(columns, operation)
+                continue
+            key = id(operation)
+            if key not in needed_columns:
+                needed_columns[key] = columns
+                continue
+            already_needed = needed_columns[key]
+            if already_needed is not None and columns is not None:
+                needed_columns[key] = already_needed | columns
+            else:
+                needed_columns[key] = None
+
+    def _with_projections(
+        self,
+        needed_columns: dict[int, set[str] | None],
+        replacements: dict[int, list[ops.Operation]],
+    ) -> "Graph":
+        """Copy of the graph with sources and sorts projected to the needed columns
+        :param needed_columns: needed columns by id of operation
+        :param replacements: already projected operations by id of original operation
+        """
+        operations: list[ops.Operation] = []
+        available_columns: set[str] | None = None
         for operation in self._operations:
+            key = id(operation)
+            if key not in replacements:
+                columns = needed_columns.get(key)
+                replacements[key] = (
+                    [operation]
+                    if columns is None
+                    else _projected(operation, columns, available_columns)
+                )
+            for replacement in replacements[key]:
+                available_columns = _output_columns(available_columns, replacement)
+                operations.append(replacement)
+        return Graph(
+            operations=operations,
+            join_graphs=[
+                join_graph._with_projections(needed_columns, replacements)
+                for join_graph in self._join_graphs
+            ],
+            sort_order=self._sort_order,
+        )
+
+    def _run_parallel(
+        self, kwargs: dict[str, tp.Any], shared_prefixes: set[tuple[int, ...]]
+    ) -> ops.TRowsGenerator:
+        spools: _TSpools = {}
+        for graph in self._graphs():
+            for end in range(2, len(graph._operations) + 1):
+                if graph._prefix_key(end) in shared_prefixes:
+                    graph._materialize(end, kwargs, shared_prefixes, spools)
+
+        context = mp.get_context("fork")
+        workers = []
+        for join_graph in self._join_graphs:
+            end = len(join_graph._operations)
+            key = join_graph._prefix_key(end)
+            if key in spools:
+                continue
+            spool = tempfile.NamedTemporaryFile()
+            worker = context.Process(
+                target=join_graph._spool_rows,
+                args=(spool.name, kwargs, shared_prefixes, spools),
+            )
+            worker.start()
+            workers.append(worker)
+            shared_prefixes.add(key)
+            spools[key] = spool
+
+        for worker in workers:
+            worker.join()
+            if worker.exitcode != 0:
+                raise RuntimeError(
+                    f"Joined graph execution failed with exit code {worker.exitcode}"
+                )
+
+        yield from self._execute(len(self._operations), kwargs, shared_prefixes, spools)
+
+    def _spool_rows(
+        self,
+        filename: str,
+        kwargs: dict[str, tp.Any],
+        shared_prefixes: set[tuple[int, ...]],
+        spools: _TSpools,
+    ) -> None:
+        """Execute the graph in a forked process writing rows into the file"""
+        with open(filename, "wb") as f:
+            for row in self._execute(
+                len(self._operations), kwargs, shared_prefixes, spools
+            ):
+                pickle.dump(row, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def _graphs(self) -> tp.Iterator["Graph"]:
+        """The graph itself and all graphs joined into it"""
+        yield self
+        for join_graph in self._join_graphs:
+            yield from join_graph._graphs()
+
+    def _prefix_key(self, end: int) -> tuple[int, ...]:
+        """Identity of the first operations of the graph
+        :param end: number of operations
+        """
+        return tuple(map(id, self._operations[:end]))
+
+    def _shared_prefixes(self) -> set[tuple[int, ...]]:
+        """Find the longest operation prefixes which are shared by several chains
+        Prefixes of sources and mappers only are cheaper to compute again than to spool,
+        so only prefixes with a sort, a reduce or a join are shared
+        """
+        graphs = list(self._graphs())
+        chains = [graph._prefix_key(len(graph._operations)) for graph in graphs]
+        counts = Counter(
+            chain[:end] for chain in chains for end in range(2, len(chain) + 1)
+        )
+        shared_prefixes: set[tuple[int, ...]] = set()
+        for graph, chain in zip(graphs, chains):
+            for end in range(len(chain), 1, -1):
+                if counts[chain[:end]] > 1:
+                    if any(map(_is_expensive, graph._operations[:end])):
+                        shared_prefixes.add(chain[:end])
+                    break
+        return shared_prefixes
+
+    def _execute(
+        self,
+        end: int,
+        kwargs: dict[str, tp.Any],
+        shared_prefixes: set[tuple[int, ...]],
+        spools: _TSpools,
+    ) -> ops.TRowsIterable:
+        """Execute the first operations of the graph
+        :param end: number of operations to execute
+        :param kwargs: data sources
+        :param shared_prefixes: operation prefixes to execute only once
+        :param spools: files with already materialized shared prefixes
+        """
+        if self._prefix_key(end) in shared_prefixes:
+            return self._replay(end, kwargs, shared_prefixes, spools)
+        return self._compute(end, kwargs, shared_prefixes, spools)
+
+    def _compute(
+        self,
+        end: int,
+        kwargs: dict[str, tp.Any],
+        shared_prefixes: set[tuple[int, ...]],
+        spools: _TSpools,
+    ) -> ops.TRowsIterable:
+        """Execute the first operations of the graph starting from the longest
+        shared prefix among them
+        """
+        start = next(
+            (
+                prefix_end
+                for prefix_end in range(end - 1, 1, -1)
+                if self._prefix_key(prefix_end) in shared_prefixes
+            ),
+            0,
+        )
+        data: ops.TRowsIterable | None = None
+        if start > 0:
+            data = self._replay(start, kwargs, shared_prefixes, spools)
+
+        join_graphs_cnt: int = sum(
+            isinstance(operation, ops.Join) for operation in self._operations[:start]
+        )
+        for operation in self._operations[start:end]:
             if isinstance(operation, ops.Read | ops.ReadIterFactory):
                 data = operation(**kwargs)
             elif isinstance(operation, ops.Join):
@@ -87,7 +707,10 @@ class Graph:
                 assert data is not None
                 join_graph = self._join_graphs[join_graphs_cnt]
                 join_graphs_cnt += 1
-                data = operation(data, join_graph.run(**kwargs))
+                join_data = join_graph._execute(
+                    len(join_graph._operations), kwargs, shared_prefixes, spools
+                )
+                data = operation(data, join_data)
             else:
                 assert data is not None
                 data = operation(data)
@@ -95,3 +718,57 @@ class Graph:
         assert data is not None
 
         return data
+
+    def _replay(
+        self,
+        end: int,
+        kwargs: dict[str, tp.Any],
+        shared_prefixes: set[tuple[int, ...]],
+        spools: _TSpools,
+    ) -> ops.TRowsGenerator:
+        """Read output of the first operations of the graph from the spool file,
+        materializing it on the first access; compute it again if it can't be spooled
+        Every reader opens the file on its own, so readers do not move each other's offsets
+        """
+        spool = self._materialize(end, kwargs, shared_prefixes, spools)
+        if spool is None:
+            yield from self._compute(end, kwargs, shared_prefixes, spools)
+            return
+        with open(spool.name, "rb") as f:
+            load = pickle.Unpickler(f).load
+            while True:
+                try:
+                    row = load()
+                except EOFError:
+                    return
+                yield row
+
+    def _materialize(
+        self,
+        end: int,
+        kwargs: dict[str, tp.Any],
+        shared_prefixes: set[tuple[int, ...]],
+        spools: _TSpools,
+    ) -> tp.IO[bytes] | None:
+        """Write output of the first operations of the graph into the spool file
+        unless it is already there
+        Returns None if rows can't be pickled, then the operations are computed
+        by every branch on its own
+        """
+        key = self._prefix_key(end)
+        if key not in spools:
+            spool = tempfile.NamedTemporaryFile()
+            picklable = True
+            with open(spool.name, "wb") as f:
+                for row in self._compute(end, kwargs, shared_prefixes, spools):
+                    try:
+                        pickle.dump(row, f, protocol=pickle.HIGHEST_PROTOCOL)
+                    except (pickle.PicklingError, TypeError, AttributeError):
+                        picklable = False
+                        break
+            if picklable:
+                spools[key] = spool
+            else:
+                spool.close()
+                spools[key] = None
+        return spools[key]
@@ -5,10 +5,18 @@ import re
 import string
 
 import calendar
+import functools
+import math
 from datetime import datetime
 
+import collections
 import heapq
 import itertools as it
+import multiprocessing as mp
+import multiprocessing.pool
+import operator
+import os
+import sys
 from collections import Counter
 
 import numpy as np
@@ -16,6 +24,17 @@ import numpy as np
 TRow = dict[str, tp.Any]
 TRowsIterable = tp.Iterable[TRow]
 TRowsGenerator = tp.Generator[TRow, None, None]
+_TMerger = tp.Callable[[TRow, TRow], TRow]
+
+
+def _group_key_getter(keys: tp.Sequence[str]) -> tp.Callable[[TRow], tp.Any]:
+    """Build function extracting grouping key of a row
+    Key is a single value for one column and a tuple of values for several columns
+    :param keys: names of key columns
+    """
+    if not keys:
+        return lambda row: ()
+    return operator.itemgetter(*keys)
 
 
 class Operation(ABC):
@@ -27,30 +46,59 @@ class Operation(ABC):
 
 
 class Read(Operation):
-    def __init__(self, filename: str, parser: tp.Callable[[str], TRow]) -> None:
+    def __init__(
+        self,
+        filename: str,
+        parser: tp.Callable[[str], TRow],
+        buffer_size: int = 1 << 20,
+        columns: tp.Sequence[str] | None = None,
+    ) -> None:
+        """
+        :param filename: filename to read from
+        :param parser: parser from string to Row
+        :param buffer_size: size of the read buffer in bytes
+        :param columns: columns to keep in parsed rows, all of them if None
+        """
         self.filename = filename
         self.parser = parser
+        self.buffer_size = buffer_size
+        self.columns = columns
 
     def __call__(self, *args: tp.Any, **kwargs: tp.Any) -> TRowsGenerator:
-        with open(self.filename) as f:
-            for line in f:
-                yield self.parser(line)
+        with open(self.filename, buffering=self.buffer_size) as f:
+            if self.columns is None:
+                yield from map(self.parser, f)
+                return
+            for row in map(self.parser, f):
+                yield {column: row[column] for column in self.columns if column in row}
 
 
 class ReadIterFactory(Operation):
-    def __init__(self, name: str) -> None:
+    def __init__(self, name: str, columns: tp.Sequence[str] | None = None) -> None:
+        """
+        :param name: name of kwarg to use as data source
+        :param columns: columns to keep in rows, all of them if None
+        """
         self.name = name
+        self.columns = columns
 
     def __call__(self, *args: tp.Any, **kwargs: tp.Any) -> TRowsGenerator:
+        # rows are copied once here, as mappers are allowed to change them in place
+        if self.columns is None:
+            for row in kwargs[self.name]():
+                yield row.copy()
+            return
         for row in kwargs[self.name]():
-            yield row
+            yield {column: row[column] for column in self.columns if column in row}
 
 
 # Operations
 
 
 class Mapper(ABC):
-    """Base class for mappers"""
+    """Base class for mappers
+    Mapper owns the row passed and may change it in place instead of copying
+    """
 
     @abstractmethod
     def __call__(self, row: TRow) -> TRowsGenerator:
@@ -60,6 +108,63 @@ class Mapper(ABC):
         raise NotImplementedError
 
 
+class RowMapper(Mapper):
+    """Base class for mappers which map every row to exactly one row
+    Map and ComposedMapper call map_row directly unless __call__ is overridden
+    """
+
+    @abstractmethod
+    def map_row(self, row: TRow) -> TRow:
+        """
+        :param row: one table row
+        """
+        raise NotImplementedError
+
+    def __call__(self, row: TRow) -> TRowsGenerator:
+        yield self.map_row(row)
+
+
+def _row_function(mapper: Mapper) -> tp.Callable[[TRow], TRow] | None:
+    """map_row of a row mapper to call instead of the mapper itself,
+    None if the mapper is not a row mapper or overrides __call__
+    :param mapper: mapper to apply
+    """
+    if isinstance(mapper, RowMapper) and type(mapper).__call__ is RowMapper.__call__:
+        return mapper.map_row
+    return None
+
+
+class ComposedMapper(Mapper):
+    """Apply several mappers one after another as a single mapper"""
+
+    def __init__(self, mappers: tp.Sequence[Mapper]) -> None:
+        """
+        :param mappers: mappers to apply in order
+        """
+        self.mappers: list[Mapper] = []
+        for mapper in mappers:
+            if isinstance(mapper, ComposedMapper):
+                self.mappers.extend(mapper.mappers)
+            else:
+                self.mappers.append(mapper)
+        self._stages: list[tuple[Mapper, tp.Callable[[TRow], TRow] | None]] = [
+            (mapper, _row_function(mapper)) for mapper in self.mappers
+        ]
+
+    def __call__(self, row: TRow) -> TRowsGenerator:
+        rows = [row]
+        for mapper, map_row in self._stages:
+            if map_row is not None:
+                rows = [map_row(stage_row) for stage_row in rows]
+            else:
+                rows = [
+                    mapped_row for stage_row in rows for mapped_row in mapper(stage_row)
+                ]
+                if not rows:
+                    return
+        yield from rows
+
+
 class Map(Operation):
     def __init__(self, mapper: Mapper) -> None:
         self.mapper = mapper
@@ -67,10 +172,99 @@ class Map(Operation):
     def __call__(
         self, rows: TRowsIterable, *args: tp.Any, **kwargs: tp.Any
     ) -> TRowsGenerator:
+        map_row = _row_function(self.mapper)
+        if map_row is not None:
+            yield from map(map_row, rows)
+            return
         for row in rows:
             yield from self.mapper(row)
 
 
+class BatchMapper(Mapper):
+    """Base class for mappers which process a whole batch of rows at once"""
+
+    @abstractmethod
+    def batch_apply(self, rows: list[TRow]) -> TRowsIterable:
+        """
+        :param rows: batch of table rows
+        """
+        raise NotImplementedError
+
+    def __call__(self, row: TRow) -> TRowsGenerator:
+        yield from self.batch_apply([row])
+
+
+class BatchMap(Operation):
+    def __init__(self, mapper: BatchMapper, batch_size: int = 4096) -> None:
+        self.mapper = mapper
+        self.batch_size = batch_size
+
+    def __call__(
+        self, rows: TRowsIterable, *args: tp.Any, **kwargs: tp.Any
+    ) -> TRowsGenerator:
+        for batch in it.batched(rows, self.batch_size):
+            yield from self.mapper.batch_apply(list(batch))
+
+
+_parallel_mapper: Mapper | None = None
+
+
+def _init_parallel_worker(mapper: Mapper) -> None:
+    global _parallel_mapper
+    _parallel_mapper = mapper
+
+
+def _map_chunk(rows: tp.Sequence[TRow]) -> list[TRow]:
+    assert _parallel_mapper is not None
+    return [mapped_row for row in rows for mapped_row in _parallel_mapper(row)]
+
+
+class ParallelMap(Operation):
+    """Apply mapper to chunks of rows in a pool of forked processes
+    Rows are yielded in input order; input which fits into a single chunk
+    is mapped in the current process
+    """
+
+    def __init__(
+        self, mapper: Mapper, chunk_size: int = 10_000, workers: int | None = None
+    ) -> None:
+        """
+        :param mapper: mapper to apply
+        :param chunk_size: number of rows sent to a worker at once
+        :param workers: number of worker processes, number of CPUs if None
+        """
+        self.mapper = mapper
+        self.chunk_size = chunk_size
+        self.workers = workers or os.cpu_count() or 1
+
+    def __call__(
+        self, rows: TRowsIterable, *args: tp.Any, **kwargs: tp.Any
+    ) -> TRowsGenerator:
+        chunks = it.batched(rows, self.chunk_size)
+        head = list(it.islice(chunks, 2))
+        if len(head) < 2 or "fork" not in mp.get_all_start_methods():
+            for chunk in it.chain(head, chunks):
+                for row in chunk:
+                    yield from self.mapper(row)
+            return
+
+        # mapper is passed to workers on fork, so it does not have to be picklable;
+        # the number of chunks in flight is bounded to keep memory usage flat
+        context = mp.get_context("fork")
+        with context.Pool(
+            self.workers, initializer=_init_parallel_worker, initargs=(self.mapper,)
+        ) as pool:
+            pending: collections.deque[mp.pool.AsyncResult[list[TRow]]] = (
+                collections.deque()
+            )
+            for chunk in it.chain(head, chunks):
+                pending.append(pool.apply_async(_map_chunk, (chunk,)))
+                if len(pending) > 2 * self.workers:
+                    yield from pending.popleft().get()
+            while pending:
+                yield from pending.popleft().get()
+
+
 class Reducer(ABC):
     """Base class for reducers"""
 
@@ -87,15 +281,51 @@ class Reducer(ABC):
 class Reduce(Operation):
     def __init__(self, reducer: Reducer, keys: tp.Sequence[str]) -> None:
         self.reducer = reducer
-        self.keys = keys
+        self.keys = [sys.intern(key) for key in keys]
+        self._group_key = _group_key_getter(self.keys)
 
     def __call__(
         self, rows: TRowsIterable, *args: tp.Any, **kwargs: tp.Any
     ) -> TRowsGenerator:
-        for _, group in it.groupby(
-            rows, key=lambda row: tuple(row[key] for key in self.keys)
-        ):
-            yield from self.reducer(tuple(self.keys), group)
+        group_key = tuple(self.keys)
+        for _, group in it.groupby(rows, key=self._group_key):
+            yield from self.reducer(group_key, group)
+
+
+class HashReduce(Operation):
+    """Reduce which groups rows in memory and does not need sorted input
+    Groups are emitted in the order of their keys. Once more than max_rows rows
+    are buffered, all rows are passed through fallback_sort and reduced as usual
+    """
+
+    def __init__(
+        self,
+        reducer: Reducer,
+        keys: tp.Sequence[str],
+        max_rows: int = 100_000,
+        fallback_sort: Operation | None = None,
+    ) -> None:
+        self.reducer = reducer
+        self.keys = [sys.intern(key) for key in keys]
+        self.max_rows = max_rows
+        self.fallback_sort = fallback_sort
+        self._group_key = _group_key_getter(self.keys)
+
+    def __call__(
+        self, rows: TRowsIterable, *args: tp.Any, **kwargs: tp.Any
+    ) -> TRowsGenerator:
+        rows_iter = iter(rows)
+        groups: dict[tp.Any, list[TRow]] = {}
+        for rows_cnt, row in enumerate(rows_iter, 1):
+            groups.setdefault(self._group_key(row), []).append(row)
+            if self.fallback_sort is not None and rows_cnt >= self.max_rows:
+                buffered_rows = it.chain.from_iterable(groups.values())
+                sorted_rows = self.fallback_sort(it.chain(buffered_rows, rows_iter))
+                yield from Reduce(self.reducer, self.keys)(sorted_rows)
+                return
+        keys = tuple(self.keys)
+        for group_key in sorted(groups):
+            yield from self.reducer(keys, iter(groups.pop(group_key)))
 
 
 class Joiner(ABC):
@@ -104,6 +334,9 @@ class Joiner(ABC):
     def __init__(self, suffix_a: str = "_1", suffix_b: str = "_2") -> None:
         self._a_suffix = suffix_a
         self._b_suffix = suffix_b
+        self._mergers: dict[
+            tuple[tuple[str, ...], tuple[str, ...], tuple[str, ...]], _TMerger
+        ] = {}
 
     @abstractmethod
     def __call__(
@@ -116,130 +349,183 @@ class Joiner(ABC):
         """
         raise NotImplementedError
 
+    def _merger(
+        self, keys: tp.Sequence[str], cols_a: tuple[str, ...], cols_b: tuple[str, ...]
+    ) -> _TMerger:
+        """Function merging a left row and a right row with given columns,
+        generated once per joiner and column layout
+        :param keys: join keys
+        :param cols_a: columns of the left row
+        :param cols_b: columns of the right row
+        """
+        merger_key = (tuple(keys), cols_a, cols_b)
+        merger = self._mergers.get(merger_key)
+        if merger is None:
+            merger = self._mergers[merger_key] = self._build_merger(*merger_key)
+        return merger
+
+    def _build_merger(
+        self, keys: tuple[str, ...], cols_a: tuple[str, ...], cols_b: tuple[str, ...]
+    ) -> _TMerger:
+        common_cols = (set(cols_a) & set(cols_b)) - set(keys)
+        # merged columns are written in this order and a later write of a column
+        # wins, e.g. a non-common "x_1" overwrites the suffixed common "x"
+        sources = {col: f"row_a[{col!r}]" for col in keys}
+        for col in cols_a:
+            if col in common_cols:
+                sources[col + self._a_suffix] = f"row_a[{col!r}]"
+                sources[col + self._b_suffix] = f"row_b[{col!r}]"
+        for col in cols_a:
+            if col not in common_cols:
+                sources[col] = f"row_a[{col!r}]"
+        for col in cols_b:
+            if col not in common_cols:
+                sources[col] = f"row_b[{col!r}]"
+        items = [f"{col!r}: {source}" for col, source in sources.items()]
+        # a dict display is the cheapest way to build the merged row,
+        # so it is compiled for the column layout instead of being interpreted
+        source = "def merge(row_a, row_b):\n    return {" + ", ".join(items) + "}\n"
+        namespace: dict[str, tp.Any] = {}
+        exec(source, namespace)
+        return namespace["merge"]
+
     def _merge_rows(self, keys: tp.Sequence[str], row_a: TRow, row_b: TRow) -> TRow:
-        merged_row = TRow()
-        cols_a = set(row_a.keys())
-        cols_b = set(row_b.keys())
-        common_cols = (cols_a & cols_b) - set(keys)
-        for col in keys:
-            merged_row[col] = row_a[col]
-        for col in common_cols:
-            merged_row[col + self._a_suffix] = row_a[col]
-            merged_row[col + self._b_suffix] = row_b[col]
-        for col in cols_a - common_cols:
-            merged_row[col] = row_a[col]
-        for col in cols_b - common_cols:
-            merged_row[col] = row_b[col]
-        return merged_row
+        return self._merger(keys, tuple(row_a), tuple(row_b))(row_a, row_b)
+
+    @staticmethod
+    def _split_smaller(
+        rows_a: TRowsIterable, rows_b: TRowsIterable
+    ) -> tuple[list[TRow], TRowsIterable, bool]:
+        """Read both tables in turns until one of them ends, so that only the smaller one
+        is kept in memory
+        Returns rows of the smaller table, rows of the larger one
+        and whether the smaller table is the left one
+        :param rows_a: left table rows
+        :param rows_b: right table rows
+        """
+        iter_a, iter_b = iter(rows_a), iter(rows_b)
+        list_a: list[TRow] = []
+        list_b: list[TRow] = []
+        while True:
+            row_a = next(iter_a, None)
+            if row_a is None:
+                return list_a, it.chain(list_b, iter_b), True
+            list_a.append(row_a)
+            row_b = next(iter_b, None)
+            if row_b is None:
+                return list_b, it.chain(list_a, iter_a), False
+            list_b.append(row_b)
+
+    def _product(
+        self,
+        keys: tp.Sequence[str],
+        smaller: list[TRow],
+        larger: TRowsIterable,
+        smaller_is_a: bool,
+    ) -> TRowsGenerator:
+        """Merge every pair of rows of two tables streaming the larger one
+        :param keys: join keys
+        :param smaller: rows of the smaller table
+        :param larger: rows of the larger table
+        :param smaller_is_a: whether the smaller table is the left one
+        """
+        # rows of a group usually share columns, so the merged row layout
+        # is computed once per pair of distinct column sets
+        smaller_by_cols: dict[tuple[str, ...], list[TRow]] = {}
+        for smaller_row in smaller:
+            smaller_by_cols.setdefault(tuple(smaller_row), []).append(smaller_row)
+        mergers: dict[tuple[tuple[str, ...], tuple[str, ...]], _TMerger] = {}
+        for row in larger:
+            row_cols = tuple(row)
+            for smaller_cols, smaller_rows in smaller_by_cols.items():
+                merger_key = (
+                    (smaller_cols, row_cols)
+                    if smaller_is_a
+                    else (row_cols, smaller_cols)
+                )
+                if merger_key not in mergers:
+                    mergers[merger_key] = self._merger(keys, *merger_key)
+                merge = mergers[merger_key]
+                if smaller_is_a:
+                    for smaller_row in smaller_rows:
+                        yield merge(smaller_row, row)
+                else:
+                    for smaller_row in smaller_rows:
+                        yield merge(row, smaller_row)
 
 
 class Join(Operation):
+    """Join two tables sorted by keys in the natural order of key values,
+    the order in which Graph.sort sorts them
+    """
+
     def __init__(self, joiner: Joiner, keys: tp.Sequence[str]):
-        self.keys = keys
+        self.keys = [sys.intern(key) for key in keys]
         self.joiner = joiner
-
-    @staticmethod
-    def _is_less(a: tuple[tp.Any, ...], b: tuple[tp.Any, ...]) -> bool:
-        assert len(a) == len(b)
-        for a_val, b_val in zip(a, b):
-            if str(a_val) < str(b_val):
-                return True
-            if str(a_val) > str(b_val):
-                return False
-        return False
+        self._group_key = _group_key_getter(self.keys)
 
     def __call__(
         self, rows: TRowsIterable, *args: tp.Any, **kwargs: tp.Any
     ) -> TRowsGenerator:
-        groups_a = it.groupby(
-            rows, key=lambda row: tuple(row[key] for key in self.keys)
-        )
-        groups_b = it.groupby(
-            args[0], key=lambda row: tuple(row[key] for key in self.keys)
-        )
+        if not self.keys and isinstance(
+            self.joiner, InnerJoiner | OuterJoiner | LeftJoiner | RightJoiner
+        ):
+            # without keys both tables form a single group, so the smaller table
+            # is broadcast to the larger one without grouping and merging
+            yield from self.joiner(self.keys, rows, args[0])
+            return
+
+        if not isinstance(
+            self.joiner, InnerJoiner | OuterJoiner | LeftJoiner | RightJoiner
+        ):
+            raise ValueError("Unknown joiner type")
+        unmatched_a = isinstance(self.joiner, OuterJoiner | LeftJoiner)
+        unmatched_b = isinstance(self.joiner, OuterJoiner | RightJoiner)
+        for group_a, group_b in self._merge_groups(
+            rows, args[0], unmatched_a, unmatched_b
+        ):
+            yield from self.joiner(self.keys, group_a, group_b)
+
+    def _merge_groups(
+        self,
+        rows_a: TRowsIterable,
+        rows_b: TRowsIterable,
+        unmatched_a: bool,
+        unmatched_b: bool,
+    ) -> tp.Iterator[tuple[TRowsIterable, TRowsIterable]]:
+        """Walk both tables sorted by keys in a single pass pairing groups with equal keys
+        Every group has to be consumed before the next pair is requested
+        :param rows_a: left table rows
+        :param rows_b: right table rows
+        :param unmatched_a: pair left groups without match with empty right group
+        :param unmatched_b: pair right groups without match with empty left group
+        """
+        groups_a = it.groupby(rows_a, key=self._group_key)
+        groups_b = it.groupby(rows_b, key=self._group_key)
         group_key_b, group_b = next(groups_b, (None, None))
-        if isinstance(self.joiner, InnerJoiner):
-            for group_key_a, group_a in groups_a:
-                while (
-                    group_key_b is not None
-                    and group_b is not None
-                    and self._is_less(group_key_b, group_key_a)
-                ):
-                    group_key_b, group_b = next(groups_b, (None, None))
-                if (
-                    group_key_b is not None
-                    and group_b is not None
-                    and group_key_a == group_key_b
-                ):
-                    yield from self.joiner(self.keys, group_a, group_b)
-                    group_key_b, group_b = next(groups_b, (None, None))
-        elif isinstance(self.joiner, OuterJoiner):
-            for group_key_a, group_a in groups_a:
-                while (
-                    group_key_b is not None
-                    and group_b is not None
-                    and self._is_less(group_key_b, group_key_a)
-                ):
-                    yield from self.joiner(self.keys, [], group_b)
-                    group_key_b, group_b = next(groups_b, (None, None))
-                if (
-                    group_key_b is not None
-                    and group_b is not None
-                    and group_key_a == group_key_b
-                ):
-                    yield from self.joiner(self.keys, group_a, group_b)
-                    group_key_b, group_b = next(groups_b, (None, None))
-                else:
-                    yield from self.joiner(self.keys, group_a, [])
-            while group_key_b is not None and group_b is not None:
-                yield from self.joiner(self.keys, [], group_b)
+        for group_key_a, group_a in groups_a:
+            while group_b is not None and group_key_b < group_key_a:
+                if unmatched_b:
+                    yield [], group_b
                 group_key_b, group_b = next(groups_b, (None, None))
-        elif isinstance(self.joiner, LeftJoiner):
-            for group_key_a, group_a in groups_a:
-                while (
-                    group_key_b is not None
-                    and group_b is not None
-                    and self._is_less(group_key_b, group_key_a)
-                ):
-                    group_key_b, group_b = next(groups_b, (None, None))
-                if (
-                    group_key_b is not None
-                    and group_b is not None
-                    and group_key_a == group_key_b
-                ):
-                    yield from self.joiner(self.keys, group_a, group_b)
-                else:
-                    yield from self.joiner(self.keys, group_a, [])
-        elif isinstance(self.joiner, RightJoiner):
-            for group_key_a, group_a in groups_a:
-                while (
-                    group_key_b is not None
-                    and group_b is not None
-                    and self._is_less(group_key_b, group_key_a)
-                ):
-                    yield from self.joiner(self.keys, [], group_b)
-                    group_key_b, group_b = next(groups_b, (None, None))
-                if (
-                    group_key_b is not None
-                    and group_b is not None
-                    and group_key_a == group_key_b
-                ):
-                    yield from self.joiner(self.keys, group_a, group_b)
-            while group_key_b is not None and group_b is not None:
-                yield from self.joiner(self.keys, [], group_b)
+            if group_b is not None and group_key_a == group_key_b:
+                yield group_a, group_b
                 group_key_b, group_b = next(groups_b, (None, None))
-        else:
-            raise ValueError("Unknown joiner type")
+            elif unmatched_a:
+                yield group_a, []
+        while group_b is not None and unmatched_b:
+            yield [], group_b
+            group_key_b, group_b = next(groups_b, (None, None))
 
 
 # Dummy operators
 
 
-class DummyMapper(Mapper):
+class DummyMapper(RowMapper):
     """Yield exactly the row passed"""
 
-    def __call__(self, row: TRow) -> TRowsGenerator:
-        yield row
+    def map_row(self, row: TRow) -> TRow:
+        return row
 
 
 class FirstReducer(Reducer):
@@ -256,7 +542,25 @@ class FirstReducer(Reducer):
 # Mappers
 
 
-class Division(Mapper):
+_PUNCTUATION_TABLE = str.maketrans("", "", string.punctuation)
+
+
+@functools.cache
+def _separator_pattern(separator: str) -> re.Pattern[str]:
+    """Compiled pattern to split by
+    :param separator: string to separate by
+    """
+    return re.compile(separator)
+
+
+def _is_literal_pattern(separator: str) -> bool:
+    """Check whether separator pattern matches only the separator itself
+    :param separator: string to separate by
+    """
+    return bool(separator) and not any(char in r".^$*+?{}[]\|()" for char in separator)
+
+
+class Division(RowMapper):
     """Calculates quotient of two columns"""
 
     def __init__(
@@ -266,20 +570,17 @@ class Division(Mapper):
         :param column: name of column to process
         :param result_column: name of column to save result in
         """
-        self.column_num = column_num
-        self.column_den = column_den
-        self.result_column = result_column
+        self.column_num = sys.intern(column_num)
+        self.column_den = sys.intern(column_den)
+        self.result_column = sys.intern(result_column)
 
-    def __call__(self, row: TRow) -> TRowsGenerator:
-        mapped_row = row.copy()
-        if self.column_num in mapped_row and self.column_den in mapped_row:
-            mapped_row[self.result_column] = (
-                mapped_row[self.column_num] / mapped_row[self.column_den]
-            )
-        yield mapped_row
+    def map_row(self, row: TRow) -> TRow:
+        if self.column_num in row and self.column_den in row:
+            row[self.result_column] = row[self.column_num] / row[self.column_den]
+        return row
 
 
-class Logarithm(Mapper):
+class Logarithm(RowMapper):
     """Calculates logarithm of column value"""
 
     def __init__(self, column: str, result_column: str = "logarithm") -> None:
@@ -287,53 +588,52 @@ class Logarithm(Mapper):
         :param column: name of column to process
         :param result_column: name of column to save result in
         """
-        self.column = column
-        self.result_column = result_column
+        self.column = sys.intern(column)
+        self.result_column = sys.intern(result_column)
 
-    def __call__(self, row: TRow) -> TRowsGenerator:
-        mapped_row = row.copy()
-        if self.column in mapped_row:
-            mapped_row[self.result_column] = float(np.log(mapped_row[self.column]))
-        yield mapped_row
+    def map_row(self, row: TRow) -> TRow:
+        if self.column in row:
+            value = row[self.column]
+            if value > 0:
+                row[self.result_column] = math.log(value)
+            else:
+                # math.log raises outside of its domain, np.log gives -inf or nan
+                row[self.result_column] = float(np.log(value))
+        return row
 
 
-class FilterPunctuation(Mapper):
+class FilterPunctuation(RowMapper):
     """Leave only non-punctuation symbols"""
 
     def __init__(self, column: str):
         """
         :param column: name of column to process
         """
-        self.column = column
+        self.column = sys.intern(column)
 
-    def __call__(self, row: TRow) -> TRowsGenerator:
-        mapped_row = row.copy()
-        punctuation_filter = re.compile(f"[{re.escape(string.punctuation)}]")
-        if self.column in mapped_row:
-            mapped_row[self.column] = punctuation_filter.sub(
-                "", str(mapped_row[self.column])
-            )
-        yield mapped_row
+    def map_row(self, row: TRow) -> TRow:
+        if self.column in row:
+            row[self.column] = str(row[self.column]).translate(_PUNCTUATION_TABLE)
+        return row
 
 
-class LowerCase(Mapper):
+class LowerCase(RowMapper):
     """Replace column value with value in lower case"""
 
     def __init__(self, column: str):
         """
         :param column: name of column to process
         """
-        self.column = column
+        self.column = sys.intern(column)
 
     @staticmethod
     def _lower_case(txt: str) -> str:
         return txt.lower()
 
-    def __call__(self, row: TRow) -> TRowsGenerator:
-        mapped_row = row.copy()
-        if self.column in mapped_row:
-            mapped_row[self.column] = self._lower_case(mapped_row[self.column])
-        yield mapped_row
+    def map_row(self, row: TRow) -> TRow:
+        if self.column in row:
+            row[self.column] = self._lower_case(row[self.column])
+        return row
 
 
 class Split(Mapper):
@@ -344,29 +644,47 @@ class Split(Mapper):
         :param column: name of column to split
         :param separator: string to separate by
         """
-        self.column = column
+        self.column = sys.intern(column)
         self.separator = separator
+        # whitespace and literal separators are split by str.split
+        self._pattern = (
+            None
+            if separator is None or _is_literal_pattern(separator)
+            else _separator_pattern(separator)
+        )
+
+    def _split(self, text: str) -> list[str]:
+        """Split text the same way as matching separator pattern one by one does:
+        empty piece before the leading separator is kept, after the trailing one is not
+        :param text: text to split
+        """
+        if self.separator is None:
+            pieces = text.split()
+            if text[:1].isspace():
+                pieces.insert(0, "")
+            return pieces
+        if self._pattern is None:
+            pieces = text.split(self.separator)
+            if not pieces[-1]:
+                pieces.pop()
+            return pieces
+
+        pieces = []
+        start = 0
+        for match in self._pattern.finditer(text):
+            pieces.append(text[start : match.start()])
+            start = match.end()
+        if start < len(text):
+            pieces.append(text[start:])
+        return pieces
 
     def __call__(self, row: TRow) -> TRowsGenerator:
         if self.column in row:
-            separator_pattern = r"\s+" if self.separator is None else self.separator
-            matches = re.finditer(separator_pattern, row[self.column])
-
-            start = 0
-            for match in matches:
-                end = match.start()
-                mapped_row = row.copy()
-                mapped_row[self.column] = row[self.column][start:end]
-                start = match.end()
-                yield mapped_row
+            for piece in self._split(row[self.column]):
+                yield {**row, self.column: piece}
 
-            if start < len(row[self.column]):
-                mapped_row = row.copy()
-                mapped_row[self.column] = row[self.column][start:]
-                yield mapped_row
 
-
-class Product(Mapper):
+class Product(RowMapper):
     """Calculates product of multiple columns"""
 
     def __init__(
@@ -376,16 +694,16 @@ class Product(Mapper):
         :param columns: column names to product
         :param result_column: column name to save product in
         """
-        self.columns = columns
-        self.result_column = result_column
+        self.columns = [sys.intern(column) for column in columns]
+        self.result_column = sys.intern(result_column)
 
-    def __call__(self, row: TRow) -> TRowsGenerator:
-        mapped_row = row.copy()
-        product = 1
-        for column in self.columns:
-            product *= mapped_row[column]
-        mapped_row[self.result_column] = product
-        yield mapped_row
+    def map_row(self, row: TRow) -> TRow:
+        columns = self.columns
+        if len(columns) == 2:
+            row[self.result_column] = row[columns[0]] * row[columns[1]]
+        else:
+            row[self.result_column] = math.prod(row[column] for column in columns)
+        return row
 
 
 class Filter(Mapper):
@@ -402,24 +720,20 @@ class Filter(Mapper):
             yield row
 
 
-class Project(Mapper):
+class Project(RowMapper):
     """Leave only mentioned columns"""
 
     def __init__(self, columns: tp.Sequence[str]) -> None:
         """
         :param columns: names of columns
         """
-        self.columns = columns
+        self.columns = [sys.intern(column) for column in columns]
 
-    def __call__(self, row: TRow) -> TRowsGenerator:
-        mapped_row = TRow()
-        for column in self.columns:
-            if column in row:
-                mapped_row[column] = row[column]
-        yield mapped_row
+    def map_row(self, row: TRow) -> TRow:
+        return {column: row[column] for column in self.columns if column in row}
 
 
-class Rename(Mapper):
+class Rename(RowMapper):
     """Leave only mentioned columns"""
 
     def __init__(self, column: str, new_column: str) -> None:
@@ -427,18 +741,16 @@ class Rename(Mapper):
         :param column: column name to rename
         :param new_column: new column name
         """
-        self.column = column
-        self.new_column = new_column
+        self.column = sys.intern(column)
+        self.new_column = sys.intern(new_column)
 
-    def __call__(self, row: TRow) -> TRowsGenerator:
-        mapped_row = row.copy()
-        if self.column in mapped_row:
-            del mapped_row[self.column]
-            mapped_row[self.new_column] = row[self.column]
-        yield mapped_row
+    def map_row(self, row: TRow) -> TRow:
+        if self.column in row:
+            row[self.new_column] = row.pop(self.column)
+        return row
 
 
-class Haversine(Mapper):
+class Haversine(BatchMapper):
     """Calculates distance between two points on the Earth"""
 
     EARTH_RADIUS = 6373
@@ -451,9 +763,9 @@ class Haversine(Mapper):
         :param b_column: name of column with second point
         :param result_column: name of column to save result in
         """
-        self.a_column = a_column
-        self.b_column = b_column
-        self.result_column = result_column
+        self.a_column = sys.intern(a_column)
+        self.b_column = sys.intern(b_column)
+        self.result_column = sys.intern(result_column)
 
     def _haversine(
         self, a_lat: float, a_lon: float, b_lat: float, b_lon: float
@@ -465,31 +777,121 @@ class Haversine(Mapper):
         :param b_lat: latitude of the second point
         :param b_lon: longitude of the second point
         """
+        a_lat_rad = math.radians(a_lat)
+        a_lon_rad = math.radians(a_lon)
+        b_lat_rad = math.radians(b_lat)
+        b_lon_rad = math.radians(b_lon)
+
+        half_delta_lat_sin = math.sin((b_lat_rad - a_lat_rad) / 2.0)
+        half_delta_lon_sin = math.sin((b_lon_rad - a_lon_rad) / 2.0)
+        chord = (
+            half_delta_lat_sin**2
+            + math.cos(a_lat_rad) * math.cos(b_lat_rad) * half_delta_lon_sin**2
+        )
+        return 2000.0 * self.EARTH_RADIUS * math.asin(math.sqrt(chord))
+
+    def _haversine_batch(
+        self,
+        a_lat: np.ndarray,
+        a_lon: np.ndarray,
+        b_lat: np.ndarray,
+        b_lon: np.ndarray,
+    ) -> np.ndarray:
+        """
+        Calculate the great circle distances between arrays of points on the Earth in meters
+        :param a_lat: latitudes of the first points
+        :param a_lon: longitudes of the first points
+        :param b_lat: latitudes of the second points
+        :param b_lon: longitudes of the second points
+        """
         a_lat_rad = np.radians(a_lat)
         a_lon_rad = np.radians(a_lon)
         b_lat_rad = np.radians(b_lat)
         b_lon_rad = np.radians(b_lon)
 
-        delta_lat = b_lat_rad - a_lat_rad
-        delta_lon = b_lon_rad - a_lon_rad
-        numerator = (
-            1.0
-            - np.cos(delta_lat)
-            + np.cos(a_lat_rad) * np.cos(b_lat_rad) * (1.0 - np.cos(delta_lon))
+        # half-angle form 1 - cos(x) = 2 * sin(x / 2) ** 2 keeps precision
+        # for the short edges where 1 - cos(x) cancels out
+        half_delta_lat_sin = np.sin((b_lat_rad - a_lat_rad) / 2.0)
+        half_delta_lon_sin = np.sin((b_lon_rad - a_lon_rad) / 2.0)
+        chord = (
+            half_delta_lat_sin**2
+            + np.cos(a_lat_rad) * np.cos(b_lat_rad) * half_delta_lon_sin**2
         )
 
-        return 2000.0 * self.EARTH_RADIUS * np.arcsin(np.sqrt(numerator / 2.0))
+        return 2000.0 * self.EARTH_RADIUS * np.arcsin(np.sqrt(chord))
 
     def __call__(self, row: TRow) -> TRowsGenerator:
-        mapped_row = row.copy()
-        if self.a_column in mapped_row and self.b_column in mapped_row:
-            a_lon, a_lat = mapped_row[self.a_column]
-            b_lon, b_lat = mapped_row[self.b_column]
-            mapped_row[self.result_column] = self._haversine(a_lat, a_lon, b_lat, b_lon)
-        yield mapped_row
+        if self.a_column in row and self.b_column in row:
+            a_lon, a_lat = row[self.a_column]
+            b_lon, b_lat = row[self.b_column]
+            row[self.result_column] = self._haversine(a_lat, a_lon, b_lat, b_lon)
+        yield row
+
+    def batch_apply(self, rows: list[TRow]) -> TRowsIterable:
+        rows_with_points = [
+            row for row in rows if self.a_column in row and self.b_column in row
+        ]
+        if rows_with_points:
+            a_points = np.array(
+                [row[self.a_column] for row in rows_with_points], dtype=np.float64
+            )
+            b_points = np.array(
+                [row[self.b_column] for row in rows_with_points], dtype=np.float64
+            )
+            distances = self._haversine_batch(
+                a_points[:, 1], a_points[:, 0], b_points[:, 1], b_points[:, 0]
+            )
+            for row, distance in zip(rows_with_points, distances.tolist()):
+                row[self.result_column] = distance
+        return rows
+
 
+_TIMESTAMP_FORMATS = ("%Y%m%dT%H%M%S.%f", "%Y%m%dT%H%M%S")
+_TIMESTAMP_PATTERN = re.compile(
+    r"(\d{4})(\d{2})(\d{2})T(\d{2})(\d{2})(\d{2})(?:\.(\d{1,6}))?", re.ASCII
+)
 
-class Hour(Mapper):
+
+def _parse_timestamp(timestamp: tp.Any) -> datetime | None:
+    """Parse timestamp in any of _TIMESTAMP_FORMATS, None if it matches none of them
+    or is not a string
+    :param timestamp: timestamp to parse
+    """
+    if not isinstance(timestamp, str):
+        return None
+    return _parse_timestamp_str(timestamp)
+
+
+@functools.lru_cache(maxsize=1024)
+def _parse_timestamp_str(timestamp: str) -> datetime | None:
+    """Timestamps of the usual fixed width are parsed by offsets, the rest by strptime.
+    Cached because the same timestamp is parsed by several mappers in a row
+    :param timestamp: timestamp to parse
+    """
+    match = _TIMESTAMP_PATTERN.fullmatch(timestamp)
+    if match is not None:
+        year, month, day, hour, minute, second, fraction = match.groups()
+        try:
+            return datetime(
+                int(year),
+                int(month),
+                int(day),
+                int(hour),
+                int(minute),
+                int(second),
+                int(fraction.ljust(6, "0")) if fraction else 0,
+            )
+        except ValueError:
+            pass
+    for timestamp_format in _TIMESTAMP_FORMATS:
+        try:
+            return datetime.strptime(timestamp, timestamp_format)
+        except ValueError:
+            pass
+    return None
+
+
+class Hour(RowMapper):
     """Get hour from timestamp"""
 
     def __init__(self, column: str, result_column: str) -> None:
@@ -497,25 +899,18 @@ class Hour(Mapper):
         :param column: column name to get timestamp from
         :param result_column: new column name
         """
-        self.column = column
-        self.result_column = result_column
+        self.column = sys.intern(column)
+        self.result_column = sys.intern(result_column)
 
-    def __call__(self, row: TRow) -> TRowsGenerator:
-        mapped_row = row.copy()
-        if self.column in mapped_row:
-            try:
-                time = datetime.strptime(mapped_row[self.column], "%Y%m%dT%H%M%S.%f")
-                mapped_row[self.result_column] = time.hour
-            except Exception:
-                try:
-                    time = datetime.strptime(mapped_row[self.column], "%Y%m%dT%H%M%S")
-                    mapped_row[self.result_column] = time.hour
-                except Exception:
-                    pass
-        yield mapped_row
-
-
-class Weekday(Mapper):
+    def map_row(self, row: TRow) -> TRow:
+        if self.column in row:
+            time = _parse_timestamp(row[self.column])
+            if time is not None:
+                row[self.result_column] = time.hour
+        return row
+
+
+class Weekday(RowMapper):
     """Get weekday from timestamp"""
 
     def __init__(self, column: str, result_column: str) -> None:
@@ -523,41 +918,33 @@ class Weekday(Mapper):
         :param column: column name to get timestamp from
         :param result_column: new column name
         """
-        self.column = column
-        self.result_column = result_column
+        self.column = sys.intern(column)
+        self.result_column = sys.intern(result_column)
 
-    def __call__(self, row: TRow) -> TRowsGenerator:
-        mapped_row = row.copy()
-        if self.column in mapped_row:
-            try:
-                time = datetime.strptime(mapped_row[self.column], "%Y%m%dT%H%M%S.%f")
-                mapped_row[self.result_column] = time.weekday()
-            except Exception:
-                try:
-                    time = datetime.strptime(mapped_row[self.column], "%Y%m%dT%H%M%S")
-                    mapped_row[self.result_column] = time.weekday()
-                except Exception:
-                    pass
-        yield mapped_row
-
-
-class ToCalendarWeekday(Mapper):
+    def map_row(self, row: TRow) -> TRow:
+        if self.column in row:
+            time = _parse_timestamp(row[self.column])
+            if time is not None:
+                row[self.result_column] = time.weekday()
+        return row
+
+
+class ToCalendarWeekday(RowMapper):
     """Get calendar weekday from timestamp"""
 
     def __init__(self, column: str) -> None:
         """
         :param column: column name to get weekday from
         """
-        self.column = column
+        self.column = sys.intern(column)
 
-    def __call__(self, row: TRow) -> TRowsGenerator:
-        mapped_row = row.copy()
-        if self.column in mapped_row:
-            mapped_row[self.column] = calendar.day_abbr[mapped_row[self.column]]
-        yield mapped_row
+    def map_row(self, row: TRow) -> TRow:
+        if self.column in row:
+            row[self.column] = calendar.day_abbr[row[self.column]]
+        return row
 
 
-class TimeDifference(Mapper):
+class TimeDifference(RowMapper):
     """Get time difference between two timestamps in seconds"""
 
     def __init__(self, start_column: str, end_column: str, result_column: str) -> None:
@@ -566,39 +953,20 @@ class TimeDifference(Mapper):
         :param end_column: column name to get end timestamp from
         :param result_column: new column name
         """
-        self.start_column = start_column
-        self.end_column = end_column
-        self.result_column = result_column
+        self.start_column = sys.intern(start_column)
+        self.end_column = sys.intern(end_column)
+        self.result_column = sys.intern(result_column)
 
-    def __call__(self, row: TRow) -> TRowsGenerator:
-        mapped_row = row.copy()
-        if self.start_column in mapped_row and self.end_column in mapped_row:
-            try:
-                start_time = datetime.strptime(
-                    mapped_row[self.start_column], "%Y%m%dT%H%M%S.%f"
-                )
-                end_time = datetime.strptime(
-                    mapped_row[self.end_column], "%Y%m%dT%H%M%S.%f"
-                )
-                mapped_row[self.result_column] = (end_time - start_time).total_seconds()
-            except Exception:
-                try:
-                    start_time = datetime.strptime(
-                        mapped_row[self.start_column], "%Y%m%dT%H%M%S"
-                    )
-                    end_time = datetime.strptime(
-                        mapped_row[self.end_column], "%Y%m%dT%H%M%S"
-                    )
-                    mapped_row[self.result_column] = (
-                        end_time - start_time
-                    ).total_seconds()
-                except Exception:
-                    pass
-
-        yield mapped_row
-
-
-class Normalize(Mapper):
+    def map_row(self, row: TRow) -> TRow:
+        if self.start_column in row and self.end_column in row:
+            start_time = _parse_timestamp(row[self.start_column])
+            end_time = _parse_timestamp(row[self.end_column])
+            if start_time is not None and end_time is not None:
+                row[self.result_column] = (end_time - start_time).total_seconds()
+        return row
+
+
+class Normalize(RowMapper):
     """Normalize column values by a constant"""
 
     def __init__(self, column: str, coef: float) -> None:
@@ -606,14 +974,13 @@ class Normalize(Mapper):
         :param column: column name to normalize
         :param coef: normalization coefficient
         """
-        self.column = column
+        self.column = sys.intern(column)
         self.coef = coef
 
-    def __call__(self, row: TRow) -> TRowsGenerator:
-        mapped_row = row.copy()
-        if self.column in mapped_row:
-            mapped_row[self.column] *= self.coef
-        yield mapped_row
+    def map_row(self, row: TRow) -> TRow:
+        if self.column in row:
+            row[self.column] *= self.coef
+        return row
 
 
 # Reducers
@@ -627,14 +994,15 @@ class TopN(Reducer):
         :param column: column name to get top by
         :param n: number of top values to extract
         """
-        self.column_max = column
+        self.column_max = sys.intern(column)
         self.n = n
 
     def __call__(
         self, group_key: tuple[str, ...], rows: TRowsIterable
     ) -> TRowsGenerator:
-        top_n = heapq.nlargest(self.n, rows, key=lambda row: row[self.column_max])
-        yield from top_n
+        yield from heapq.nlargest(
+            self.n, rows, key=operator.itemgetter(self.column_max)
+        )
 
 
 class TermFrequency(Reducer):
@@ -645,31 +1013,30 @@ class TermFrequency(Reducer):
         :param words_column: name for column with words
         :param result_column: name for result column
         """
-        self.words_column = words_column
-        self.result_column = result_column
+        self.words_column = sys.intern(words_column)
+        self.result_column = sys.intern(result_column)
 
     def __call__(
         self, group_key: tuple[str, ...], rows: TRowsIterable
     ) -> TRowsGenerator:
-        for row in rows:
-            key_dict = {key: row[key] for key in group_key}
-            counts = Counter(row[self.words_column] for row in rows)
-            total_words = 1 + sum(counts.values())
-            word_seen = False
-            for word, count in counts.items():
-                reduced_row = key_dict.copy()
-                reduced_row[self.words_column] = word
-                reduced_row[self.result_column] = count / total_words
-                if word == row[self.words_column]:
-                    word_seen = True
-                    reduced_row[self.result_column] += 1 / total_words
-                yield reduced_row
-            if not word_seen:
-                reduced_row = key_dict.copy()
-                reduced_row[self.words_column] = row[self.words_column]
-                reduced_row[self.result_column] = 1 / total_words
-                yield reduced_row
-            break
+        rows_iter = iter(rows)
+        first_row = next(rows_iter, None)
+        if first_row is None:
+            return
+        key_row = {key: first_row[key] for key in group_key}
+        counts = Counter(
+            map(
+                operator.itemgetter(self.words_column),
+                it.chain((first_row,), rows_iter),
+            )
+        )
+        total_words = counts.total()
+        for word, count in counts.items():
+            yield {
+                **key_row,
+                self.words_column: word,
+                self.result_column: count / total_words,
+            }
 
 
 class Count(Reducer):
@@ -686,15 +1053,18 @@ class Count(Reducer):
         """
         :param column: name for result column
         """
-        self.column = column
+        self.column = sys.intern(column)
 
     def __call__(
         self, group_key: tuple[str, ...], rows: TRowsIterable
     ) -> TRowsGenerator:
-        for row in rows:
-            reduced_row = {key: row[key] for key in group_key}
-            reduced_row[self.column] = 1 + sum(1 for _ in rows)
-            yield reduced_row
+        rows_iter = iter(rows)
+        first_row = next(rows_iter, None)
+        if first_row is None:
+            return
+        reduced_row = {key: first_row[key] for key in group_key}
+        reduced_row[self.column] = 1 + sum(1 for _ in rows_iter)
+        yield reduced_row
 
 
 class Sum(Reducer):
@@ -711,18 +1081,20 @@ class Sum(Reducer):
         """
         :param column: name for sum column
         """
-        self.column = column
+        self.column = sys.intern(column)
 
     def __call__(
         self, group_key: tuple[str, ...], rows: TRowsIterable
     ) -> TRowsGenerator:
-        for row in rows:
-            reduced_row = {key: row[key] for key in group_key}
-            reduced_row[self.column] = row[self.column] + sum(
-                row[self.column] for row in rows
-            )
-            yield reduced_row
-            break
+        rows_iter = iter(rows)
+        first_row = next(rows_iter, None)
+        if first_row is None:
+            return
+        reduced_row = {key: first_row[key] for key in group_key}
+        reduced_row[self.column] = first_row[self.column] + sum(
+            row[self.column] for row in rows_iter
+        )
+        yield reduced_row
 
 
 # Joiners
@@ -734,10 +1106,8 @@ class InnerJoiner(Joiner):
     def __call__(
         self, keys: tp.Sequence[str], rows_a: TRowsIterable, rows_b: TRowsIterable
     ) -> TRowsGenerator:
-        rows_b_list = list(rows_b)
-        for row_a in rows_a:
-            for row_b in rows_b_list:
-                yield self._merge_rows(keys, row_a, row_b)
+        smaller, larger, smaller_is_a = self._split_smaller(rows_a, rows_b)
+        yield from self._product(keys, smaller, larger, smaller_is_a)
 
 
 class OuterJoiner(Joiner):
@@ -746,17 +1116,11 @@ class OuterJoiner(Joiner):
     def __call__(
         self, keys: tp.Sequence[str], rows_a: TRowsIterable, rows_b: TRowsIterable
     ) -> TRowsGenerator:
-        row_b_list = list(rows_b)
-        if len(row_b_list) == 0:
-            yield from rows_a
+        smaller, larger, smaller_is_a = self._split_smaller(rows_a, rows_b)
+        if not smaller:
+            yield from larger
         else:
-            is_null = True
-            for row_a in rows_a:
-                is_null = False
-                for row_b in row_b_list:
-                    yield self._merge_rows(keys, row_a, row_b)
-            if is_null:
-                yield from row_b_list
+            yield from self._product(keys, smaller, larger, smaller_is_a)
 
 
 class LeftJoiner(Joiner):
@@ -765,13 +1129,12 @@ class LeftJoiner(Joiner):
     def __call__(
         self, keys: tp.Sequence[str], rows_a: TRowsIterable, rows_b: TRowsIterable
     ) -> TRowsGenerator:
-        row_b_list = list(rows_b)
-        if len(row_b_list) == 0:
-            yield from rows_a
+        smaller, larger, smaller_is_a = self._split_smaller(rows_a, rows_b)
+        if not smaller:
+            if not smaller_is_a:
+                yield from larger
         else:
-            for row_a in rows_a:
-                for row_b in row_b_list:
-                    yield self._merge_rows(keys, row_a, row_b)
+            yield from self._product(keys, smaller, larger, smaller_is_a)
 
 
 class RightJoiner(Joiner):
@@ -780,10 +1143,9 @@ class RightJoiner(Joiner):
     def __call__(
         self, keys: tp.Sequence[str], rows_a: TRowsIterable, rows_b: TRowsIterable
     ) -> TRowsGenerator:
-        row_a_list = list(rows_a)
-        if len(row_a_list) == 0:
-            yield from rows_b
+        smaller, larger, smaller_is_a = self._split_smaller(rows_a, rows_b)
+        if not smaller:
+            if smaller_is_a:
+                yield from larger
         else:
-            for row_b in rows_b:
-                for row_a in row_a_list:
-                    yield self._merge_rows(keys, row_a, row_b)
+            yield from self._product(keys, smaller, larger, smaller_is_a)
@@ -1,17 +1,20 @@
 import os
 import argparse
+import typing as tp
 
 import json
 
 from compgraph.operations import Read
 from compgraph.algorithms import pmi_graph
 
+OUTPUT_BUFFER_SIZE = 1 << 20
+
 CURRENT_PATH = os.path.dirname(os.path.abspath(__file__))
 PATH_TO_DATA = os.path.join(os.path.dirname(CURRENT_PATH), "resources")
 DEFAULT_FILE = os.path.join("extract_me", "text_corpus")
 
 
-def main() -> None:
+def main(argv: tp.Sequence[str] | None = None) -> None:
 
     parser = argparse.ArgumentParser(
         description="Run pmi graph on file from resources/"
@@ -31,7 +34,7 @@ def main() -> None:
         help="Output file path",
     )
 
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     graph = pmi_graph(
         input_stream_name="input",
         doc_column="doc_id",
@@ -42,12 +45,12 @@ def main() -> None:
     input_filepath = args.input
     output_filepath = args.output
 
-    file_reader = Read(filename=input_filepath, parser=lambda line: json.loads(line))
+    file_reader = Read(filename=input_filepath, parser=json.loads)
 
     result = graph.run(input=lambda: file_reader())
-    with open(output_filepath, "w") as out:
+    with open(output_filepath, "w", buffering=OUTPUT_BUFFER_SIZE) as out:
         for row in result:
-            print(json.dumps(row), file=out)
+            out.write(json.dumps(row) + "\n")
 
 
 if __name__ == "__main__":
@@ -1,18 +1,21 @@
 import os
 import argparse
+import typing as tp
 
 import json
 
 from compgraph.operations import Read
 from compgraph.algorithms import yandex_maps_graph
 
+OUTPUT_BUFFER_SIZE = 1 << 20
+
 CURRENT_PATH = os.path.dirname(os.path.abspath(__file__))
 PATH_TO_DATA = os.path.join(os.path.dirname(CURRENT_PATH), "resources")
 DEFAULT_TIMES_FILE = os.path.join("extract_me", "travel_times")
 DEFAULT_LENGTHS_FILE = os.path.join("extract_me", "road_graph_data")
 
 
-def main() -> None:
+def main(argv: tp.Sequence[str] | None = None) -> None:
 
     parser = argparse.ArgumentParser(description="Run pmi graph on input file")
 
@@ -41,7 +44,7 @@ def main() -> None:
         help="Output file path",
     )
 
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     graph = yandex_maps_graph(
         input_stream_name_time="times",
         input_stream_name_length="lengths",
@@ -59,15 +62,13 @@ def main() -> None:
     lengths_filepath = args.lengths
     output_filepath = args.output
 
-    times_reader = Read(filename=times_filepath, parser=lambda line: json.loads(line))
-    lengths_reader = Read(
-        filename=lengths_filepath, parser=lambda line: json.loads(line)
-    )
+    times_reader = Read(filename=times_filepath, parser=json.loads)
+    lengths_reader = Read(filename=lengths_filepath, parser=json.loads)
 
     result = graph.run(lengths=lambda: lengths_reader(), times=lambda: times_reader())
-    with open(output_filepath, "w") as out:
+    with open(output_filepath, "w", buffering=OUTPUT_BUFFER_SIZE) as out:
         for row in result:
-            print(json.dumps(row), file=out)
+            out.write(json.dumps(row) + "\n")
 
 
 if __name__ == "__main__":
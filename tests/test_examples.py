@@ -7,15 +7,28 @@ from pytest import approx
 from pathlib import PosixPath
 
 import subprocess
+import importlib.util
 
+from types import ModuleType
 from operator import itemgetter
 
 CURRENT_PATH = os.path.dirname(os.path.abspath(__file__))
 PATH_TO_SCRIPTS = os.path.join(os.path.dirname(CURRENT_PATH), "examples")
 
 
-@pytest.fixture
-def word_count_file_name(tmp_path: PosixPath) -> str:
+def load_script(name: str) -> ModuleType:
+    spec = importlib.util.spec_from_file_location(
+        name, os.path.join(PATH_TO_SCRIPTS, f"{name}.py")
+    )
+    assert spec is not None and spec.loader is not None
+    script = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(script)
+    return script
+
+
+@pytest.fixture(scope="module")
+def word_count_file_name(tmp_path_factory: pytest.TempPathFactory) -> str:
+    tmp_path = tmp_path_factory.mktemp("word_count")
     rows = [
         {"doc_id": 1, "text": "hello, my little WORLD"},
         {"doc_id": 2, "text": "Hello, my little little hell"},
@@ -44,19 +57,20 @@ def test_word_count_graph(word_count_file_name: str, tmp_path: PosixPath) -> Non
             "--output",
             output_file,
         ],
-        capture_output=True,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
     )
 
-    assert script.returncode == 0
+    assert script.returncode == 0, script.stderr.decode()
 
     with open(output_file) as out:
-        output = out.read()
-        result = [json.loads(row) for row in output.splitlines()]
+        result = [json.loads(row) for row in out]
         assert result == expected
 
 
-@pytest.fixture
-def inverted_index_file_name(tmp_path: PosixPath) -> str:
+@pytest.fixture(scope="module")
+def inverted_index_file_name(tmp_path_factory: pytest.TempPathFactory) -> str:
+    tmp_path = tmp_path_factory.mktemp("inverted_index")
     rows = [
         {"doc_id": 1, "text": "hello, little world"},
         {"doc_id": 2, "text": "little"},
@@ -86,28 +100,23 @@ def test_inverted_index_graph(
         {"doc_id": 6, "text": "world", "tf_idf": approx(0.3243, 0.001)},
     ]
     output_file = tmp_path / "output.txt"
-    script = subprocess.run(
+    load_script("run_inverted_index").main(
         [
-            "python",
-            os.path.join(PATH_TO_SCRIPTS, "run_inverted_index.py"),
             "--input",
             inverted_index_file_name,
             "--output",
-            output_file,
-        ],
-        capture_output=True,
+            str(output_file),
+        ]
     )
 
-    assert script.returncode == 0
-
     with open(output_file) as out:
-        output = out.read()
-        result = [json.loads(row) for row in output.splitlines()]
+        result = [json.loads(row) for row in out]
         assert sorted(result, key=itemgetter("doc_id", "text")) == expected
 
 
-@pytest.fixture
-def pmi_file_name(tmp_path: PosixPath) -> str:
+@pytest.fixture(scope="module")
+def pmi_file_name(tmp_path_factory: pytest.TempPathFactory) -> str:
+    tmp_path = tmp_path_factory.mktemp("pmi")
     rows = [
         {"doc_id": 1, "text": "hello, little world"},
         {"doc_id": 2, "text": "little"},
@@ -135,28 +144,23 @@ def test_pmi_graph(pmi_file_name: str, tmp_path: PosixPath) -> None:
         {"doc_id": 6, "text": "hello", "pmi": approx(0.0800, 0.001)},
     ]
     output_file = tmp_path / "output.txt"
-    script = subprocess.run(
+    load_script("run_pmi").main(
         [
-            "python",
-            os.path.join(PATH_TO_SCRIPTS, "run_pmi.py"),
             "--input",
             pmi_file_name,
             "--output",
-            output_file,
-        ],
-        capture_output=True,
+            str(output_file),
+        ]
     )
 
-    assert script.returncode == 0
-
     with open(output_file) as out:
-        output = out.read()
-        result = [json.loads(row) for row in output.splitlines()]
+        result = [json.loads(row) for row in out]
         assert result == expected
 
 
-@pytest.fixture
-def yandex_maps_file_names(tmp_path: PosixPath) -> tuple[str, str]:
+@pytest.fixture(scope="module")
+def yandex_maps_file_names(tmp_path_factory: pytest.TempPathFactory) -> tuple[str, str]:
+    tmp_path = tmp_path_factory.mktemp("yandex_maps")
     lengths = [
         {
             "start": [37.84870228730142, 55.73853974696249],
@@ -267,23 +271,17 @@ def test_yandex_maps_graph(
         {"weekday": "Wed", "hour": 14, "speed": approx(106.4505, 0.001)},
     ]
     output_file = tmp_path / "output.txt"
-    script = subprocess.run(
+    load_script("run_yandex_maps").main(
         [
-            "python",
-            os.path.join(PATH_TO_SCRIPTS, "run_yandex_maps.py"),
             "--times",
             times_fname,
             "--lengths",
             lengths_fname,
             "--output",
-            output_file,
-        ],
-        capture_output=True,
+            str(output_file),
+        ]
     )
 
-    assert script.returncode == 0
-
     with open(output_file) as out:
-        output = out.read()
-        result = [json.loads(row) for row in output.splitlines()]
+        result = [json.loads(row) for row in out]
         assert sorted(result, key=itemgetter("weekday", "hour")) == expected
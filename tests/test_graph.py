@@ -2,12 +2,12 @@ import pytest
 from pytest import approx
 
 from operator import itemgetter
-from itertools import islice, cycle
 
 import dataclasses
 import typing as tp
 
 import tempfile
+import threading
 from functools import partial
 
 from compgraph import graph
@@ -56,22 +56,30 @@ GRAPH_READ_CASES = [
 ]
 
 
+def word_count_from_file(
+    filename: str,
+    parser: tp.Callable[[str], ops.TRow],
+    text_column: str = "text",
+    count_column: str = "count",
+) -> graph.Graph:
+    return (
+        graph.Graph.graph_from_file(filename, parser)
+        .map(ops.FilterPunctuation(text_column))
+        .map(ops.LowerCase(text_column))
+        .map(ops.Split(text_column))
+        .sort([text_column])
+        .reduce(ops.Count(count_column), [text_column])
+        .sort([count_column, text_column])
+    )
+
+
 @pytest.mark.parametrize("case", GRAPH_READ_CASES)
 def test_graph_read(case: GraphReadCase) -> None:
-    with tempfile.NamedTemporaryFile(mode="w+", delete=True) as f:
-        text_column = "text"
+    with tempfile.NamedTemporaryFile(mode="w", delete=True) as f:
         count_column = "count"
         f.write(case.data)
-        f.seek(0)
-        g = (
-            graph.Graph.graph_from_file(f.name, case.parser)
-            .map(ops.FilterPunctuation(text_column))
-            .map(ops.LowerCase(text_column))
-            .map(ops.Split(text_column))
-            .sort([text_column])
-            .reduce(ops.Count(count_column), [text_column])
-            .sort([count_column, text_column])
-        )
+        f.flush()
+        g = word_count_from_file(f.name, case.parser, count_column=count_column)
         output = g.run()
         assert list(output) == case.ground_truth_a
 
@@ -200,7 +208,7 @@ def test_yandex_maps() -> None:
     ]
 
     result = graph.run(
-        travel_time=lambda: islice(cycle(iter(times)), len(times)),
+        travel_time=lambda: iter(times),
         edge_length=lambda: iter(lengths),
     )
 
@@ -226,3 +234,204 @@ def test_yandex_maps() -> None:
         graph.run(travel_time=lambda: iter(times), edge_length=lambda: iter(lengths))
     )
     assert result == []
+
+
+def test_sort_reuses_order() -> None:
+    rows = [
+        {"doc_id": 2, "text": "b", "count": 1},
+        {"doc_id": 1, "text": "b", "count": 2},
+        {"doc_id": 1, "text": "a", "count": 3},
+    ]
+    g = graph.Graph.graph_from_iter("docs").sort(["doc_id", "text"])
+    assert g.sort(["doc_id"]) is g
+    assert g.map(ops.Project(["doc_id", "count"])).sort(["text"]) is not g
+
+    summed = g.reduce(ops.Sum("count"), keys=["doc_id"])
+    assert summed.sort(["doc_id"]) is summed
+    assert list(summed.sort(["doc_id"]).run(docs=lambda: iter(rows))) == [
+        {"doc_id": 1, "count": 5},
+        {"doc_id": 2, "count": 1},
+    ]
+
+
+def test_shared_branches_run_once() -> None:
+    rows = [{"doc_id": 1, "text": "a b"}, {"doc_id": 2, "text": "b c"}]
+    calls: list[ops.TRow] = []
+
+    def condition(row: ops.TRow) -> bool:
+        calls.append(row)
+        return True
+
+    words = (
+        graph.Graph.graph_from_iter("docs")
+        .map(ops.Split("text"))
+        .map(ops.Filter(condition))
+        .sort(["text"])
+    )
+    counts = words.reduce(ops.Count("count"), keys=["text"])
+    joined = words.join(ops.InnerJoiner(), counts, keys=["text"])
+
+    result = list(joined.run(docs=lambda: iter(rows)))
+    assert sorted(result, key=itemgetter("text", "doc_id")) == [
+        {"doc_id": 1, "text": "a", "count": 1},
+        {"doc_id": 1, "text": "b", "count": 2},
+        {"doc_id": 2, "text": "b", "count": 2},
+        {"doc_id": 2, "text": "c", "count": 1},
+    ]
+    assert len(calls) == 4
+
+
+def test_run_parallel() -> None:
+    rows = [{"doc_id": 1, "text": "a b"}, {"doc_id": 2, "text": "b c b"}]
+    words = graph.Graph.graph_from_iter("docs").map(ops.Split("text")).sort(["text"])
+    counts = words.reduce(ops.Count("count"), keys=["text"])
+    total = words.reduce(ops.Count("total"), keys=[])
+    joined = words.join(ops.InnerJoiner(), counts, keys=["text"]).join(
+        ops.InnerJoiner(), total, keys=[]
+    )
+
+    expected = list(joined.run(docs=lambda: iter(rows)))
+    assert len(expected) == 5
+    assert list(joined.run_parallel(docs=lambda: iter(rows))) == expected
+
+
+def test_projection_pushdown(monkeypatch: pytest.MonkeyPatch) -> None:
+    columns_a: set[frozenset[str]] = set()
+    columns_b: set[frozenset[str]] = set()
+    inner_join = ops.InnerJoiner.__call__
+
+    def recording_join(
+        joiner: ops.InnerJoiner,
+        keys: tp.Sequence[str],
+        rows_a: ops.TRowsIterable,
+        rows_b: ops.TRowsIterable,
+    ) -> ops.TRowsGenerator:
+        rows_a, rows_b = list(rows_a), list(rows_b)
+        columns_a.update(frozenset(row) for row in rows_a)
+        columns_b.update(frozenset(row) for row in rows_b)
+        yield from inner_join(joiner, keys, rows_a, rows_b)
+
+    # the joiner keeps its exact type, so that its columns stay known
+    monkeypatch.setattr(ops.InnerJoiner, "__call__", recording_join)
+    rows = [
+        {"doc_id": 1, "text": "b", "value": 1, "payload": "x" * 100},
+        {"doc_id": 2, "text": "a", "value": 2, "payload": "y" * 100},
+        {"doc_id": 3, "text": "b", "value": 3, "payload": "z" * 100},
+    ]
+    sums = (
+        graph.Graph.graph_from_iter("docs")
+        .map(ops.Filter(lambda row: row["value"] > 0))
+        .sort(["text"])
+        .reduce(ops.Sum("value"), keys=["text"])
+    )
+    joined = (
+        graph.Graph.graph_from_iter("docs")
+        .sort(["text"])
+        .join(ops.InnerJoiner(), sums, keys=["text"])
+        .map(ops.Project(["doc_id", "value_1", "value_2"]))
+    )
+
+    assert sorted(joined.run(docs=lambda: iter(rows)), key=itemgetter("doc_id")) == [
+        {"doc_id": 1, "value_1": 1, "value_2": 4},
+        {"doc_id": 2, "value_1": 2, "value_2": 2},
+        {"doc_id": 3, "value_1": 3, "value_2": 4},
+    ]
+    assert columns_a == {frozenset({"doc_id", "text", "value"})}
+    assert columns_b == {frozenset({"text", "value"})}
+    assert all("payload" in row for row in rows)
+
+
+class _UpperCaseReader(ops.ReadIterFactory):
+    def __call__(self, *args: tp.Any, **kwargs: tp.Any) -> ops.TRowsGenerator:
+        for row in super().__call__(*args, **kwargs):
+            yield {**row, "text": row["text"].upper()}
+
+
+def test_projection_keeps_source_subclasses() -> None:
+    rows = [{"doc_id": 1, "text": "a", "payload": "x"}]
+    g = graph.Graph(operations=[_UpperCaseReader("docs")]).map(ops.Project(["text"]))
+    assert list(g.run(docs=lambda: iter(rows))) == [{"text": "A"}]
+
+
+class _FilterWritingKey(ops.Filter):
+    def __call__(self, row: ops.TRow) -> ops.TRowsGenerator:
+        for filtered_row in super().__call__(row):
+            yield {**filtered_row, "doc_id": -filtered_row["doc_id"]}
+
+
+def test_subclassed_mapper_clears_sort_order() -> None:
+    rows = [{"doc_id": 1}, {"doc_id": 2}]
+    g = graph.Graph.graph_from_iter("docs").sort(["doc_id"])
+    negated = g.map(_FilterWritingKey(lambda row: True))
+    assert negated.sort(["doc_id"]) is not negated
+    assert list(negated.sort(["doc_id"]).run(docs=lambda: iter(rows))) == [
+        {"doc_id": -2},
+        {"doc_id": -1},
+    ]
+
+
+class _WeightedSum(ops.Sum):
+    def __call__(
+        self, group_key: tuple[str, ...], rows: ops.TRowsIterable
+    ) -> ops.TRowsGenerator:
+        rows = [{**row, self.column: row[self.column] * row["weight"]} for row in rows]
+        yield from super().__call__(group_key, rows)
+
+
+def test_projection_keeps_columns_of_subclassed_reducers() -> None:
+    rows = [
+        {"text": "a", "value": 1, "weight": 2, "payload": "x"},
+        {"text": "a", "value": 3, "weight": 1, "payload": "y"},
+    ]
+    g = (
+        graph.Graph.graph_from_iter("docs")
+        .sort(["text"])
+        .reduce(_WeightedSum("value"), keys=["text"])
+    )
+    assert list(g.run(docs=lambda: iter(rows))) == [{"text": "a", "value": 5}]
+
+
+def test_shared_branches_with_unpicklable_rows() -> None:
+    lock = threading.Lock()
+    rows = [{"doc_id": 1, "text": "a", "lock": lock}, {"doc_id": 2, "text": "b"}]
+    docs = graph.Graph.graph_from_iter("docs").sort(["text"])
+    counts = docs.reduce(ops.Count("count"), keys=["text"])
+    joined = docs.join(ops.InnerJoiner(), counts, keys=["text"])
+
+    assert list(joined.run(docs=lambda: iter(rows))) == [
+        {"doc_id": 1, "text": "a", "lock": lock, "count": 1},
+        {"doc_id": 2, "text": "b", "count": 1},
+    ]
+
+
+def test_shared_mappers_are_recomputed() -> None:
+    rows = [{"doc_id": 1, "text": "a b"}]
+    calls: list[ops.TRow] = []
+
+    def condition(row: ops.TRow) -> bool:
+        calls.append(row)
+        return True
+
+    words = graph.Graph.graph_from_iter("docs").map(ops.Filter(condition))
+    joined = words.join(ops.InnerJoiner(), words, keys=["doc_id"])
+
+    assert list(joined.run(docs=lambda: iter(rows))) == [
+        {"doc_id": 1, "text_1": "a b", "text_2": "a b"}
+    ]
+    assert len(calls) == 2
+
+
+@pytest.mark.parametrize("max_rows", [100, 2])
+def test_reduce_hash(max_rows: int) -> None:
+    rows = [
+        {"text": "b", "value": 1},
+        {"text": "a", "value": 2},
+        {"text": "b", "value": 3},
+    ]
+    g = graph.Graph.graph_from_iter("docs").reduce_hash(
+        ops.Sum("value"), keys=["text"], max_rows=max_rows
+    )
+    assert list(g.run(docs=lambda: iter(rows))) == [
+        {"text": "a", "value": 2},
+        {"text": "b", "value": 4},
+    ]
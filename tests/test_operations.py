@@ -1,6 +1,6 @@
 import pytest
 
-import copy
+import math
 import tempfile
 
 import dataclasses
@@ -8,6 +8,8 @@ import typing as tp
 
 from functools import partial
 
+import numpy as np
+
 from compgraph import operations as ops
 
 
@@ -16,7 +18,7 @@ class _Key:
         self._items = args
 
     def __call__(self, d: tp.Mapping[str, tp.Any]) -> tuple[str, ...]:
-        return tuple(str(d.get(key)) for key in self._items)
+        return tuple(map(str, map(d.get, self._items)))
 
 
 @dataclasses.dataclass
@@ -90,14 +92,12 @@ OUTER_JOIN_CASES = [
 
 @pytest.mark.parametrize("case", OUTER_JOIN_CASES)
 def test_outer_join(case: JoinCase) -> None:
-    joiner_data_left_rows = [
-        copy.deepcopy(case.data_left[i]) for i in case.join_data_left_items
-    ]
+    joiner_data_left_rows = [dict(case.data_left[i]) for i in case.join_data_left_items]
     joiner_data_right_rows = [
-        copy.deepcopy(case.data_right[i]) for i in case.join_data_right_items
+        dict(case.data_right[i]) for i in case.join_data_right_items
     ]
     joiner_ground_truth_rows = [
-        copy.deepcopy(case.ground_truth[i]) for i in case.join_ground_truth_items
+        dict(case.ground_truth[i]) for i in case.join_ground_truth_items
     ]
 
     key_func = _Key(*case.cmp_keys)
@@ -209,3 +209,191 @@ def test_file_reader(case: ReadCase) -> None:
         reader = ops.Read(f.name, case.parser)
         for row, gt in zip(reader(), case.ground_truth):
             assert row == gt
+
+
+def test_composed_mapper() -> None:
+    rows = [
+        {"id": 1, "text": "Hello, little WORLD"},
+        {"id": 2, "text": "..."},
+    ]
+    mapper = ops.ComposedMapper(
+        [
+            ops.FilterPunctuation("text"),
+            ops.LowerCase("text"),
+            ops.Split("text"),
+            ops.Filter(lambda row: len(row["text"]) > 5),
+        ]
+    )
+    result = ops.Map(mapper)(iter(rows))
+    assert isinstance(result, tp.Iterator)
+    assert list(result) == [{"id": 1, "text": "little"}]
+
+
+class _DuplicatingLowerCase(ops.LowerCase):
+    def __call__(self, row: ops.TRow) -> ops.TRowsGenerator:
+        yield self.map_row(dict(row))
+        yield self.map_row(row)
+
+
+def test_row_mapper_call_override() -> None:
+    rows = [{"id": 1, "text": "A"}]
+    expected = [{"id": 1, "text": "a"}, {"id": 1, "text": "a"}]
+    assert list(ops.Map(_DuplicatingLowerCase("text"))(iter(rows))) == expected
+    mapper = ops.ComposedMapper([ops.DummyMapper(), _DuplicatingLowerCase("text")])
+    assert list(ops.Map(mapper)(iter([dict(row) for row in rows]))) == expected
+
+
+def test_haversine_batch() -> None:
+    rows = [
+        {
+            "start": [37.84870228730142, 55.73853974696249],
+            "end": [37.8490418381989, 55.73832445777953],
+        },
+        {
+            "start": [37.524768467992544, 55.88785375468433],
+            "end": [37.52415172755718, 55.88807155843824],
+        },
+        {"start": [37.56963176652789, 55.846845586784184]},
+    ]
+    mapper = ops.Haversine("start", "end", "length")
+    expected = [mapped_row for row in rows for mapped_row in mapper(row)]
+    result = ops.BatchMap(mapper, batch_size=2)(iter(rows))
+    assert isinstance(result, tp.Iterator)
+    assert list(result) == pytest.approx(expected)
+
+
+class _Sort(ops.Operation):
+    def __init__(self, *keys: str) -> None:
+        self._key = _Key(*keys)
+
+    def __call__(
+        self, rows: ops.TRowsIterable, *args: tp.Any, **kwargs: tp.Any
+    ) -> ops.TRowsGenerator:
+        yield from sorted(rows, key=self._key)
+
+
+@pytest.mark.parametrize("max_rows", [100, 2])
+def test_hash_reduce(max_rows: int) -> None:
+    rows = [
+        {"id": 2, "value": 1},
+        {"id": 1, "value": 2},
+        {"id": 2, "value": 3},
+        {"id": 3, "value": 4},
+        {"id": 1, "value": 5},
+    ]
+    result = ops.HashReduce(
+        ops.Sum("value"), ["id"], max_rows=max_rows, fallback_sort=_Sort("id")
+    )(iter(rows))
+    assert isinstance(result, tp.Iterator)
+    assert list(result) == [
+        {"id": 1, "value": 7},
+        {"id": 2, "value": 4},
+        {"id": 3, "value": 4},
+    ]
+
+
+def test_join_without_keys() -> None:
+    rows_left = [{"id": 1, "count": 2}, {"id": 2, "count": 3}]
+    rows_right = [{"total": 5}]
+    result = ops.Join(ops.InnerJoiner(), [])(iter(rows_left), iter(rows_right))
+    assert isinstance(result, tp.Iterator)
+    assert list(result) == [
+        {"id": 1, "count": 2, "total": 5},
+        {"id": 2, "count": 3, "total": 5},
+    ]
+    result = ops.Join(ops.LeftJoiner(), [])(iter(rows_left), iter([]))
+    assert list(result) == rows_left
+
+
+@pytest.mark.parametrize("chunk_size", [100, 3])
+def test_parallel_map(chunk_size: int) -> None:
+    rows = [{"doc_id": i, "text": f"{i} Hello, World!"} for i in range(20)]
+    mapper = ops.ComposedMapper(
+        [
+            ops.FilterPunctuation("text"),
+            ops.Split("text"),
+            ops.Filter(lambda row: row["text"] != "World"),
+        ]
+    )
+    expected = list(ops.Map(mapper)(iter(rows)))
+    result = ops.ParallelMap(mapper, chunk_size=chunk_size, workers=2)(iter(rows))
+    assert isinstance(result, tp.Iterator)
+    assert list(result) == expected
+
+
+@pytest.mark.parametrize(
+    "separator,text,expected",
+    [
+        (None, " one  two\tthree ", ["", "one", "two", "three"]),
+        (",", ",one,,two,", ["", "one", "", "two"]),
+        (r"[,;]\s*", "one, two;three", ["one", "two", "three"]),
+    ],
+)
+def test_split(separator: str | None, text: str, expected: list[str]) -> None:
+    result = ops.Split("text", separator)({"id": 1, "text": text})
+    assert list(result) == [{"id": 1, "text": piece} for piece in expected]
+
+
+@pytest.mark.parametrize(
+    "reducer,expected",
+    [
+        (ops.Count("count"), [{"doc_id": 1, "count": 3}]),
+        (ops.Sum("value"), [{"doc_id": 1, "value": 6}]),
+        (
+            ops.TermFrequency("text"),
+            [
+                {"doc_id": 1, "text": "a", "tf": pytest.approx(2 / 3)},
+                {"doc_id": 1, "text": "b", "tf": pytest.approx(1 / 3)},
+            ],
+        ),
+    ],
+)
+def test_reducers_accept_sequences(
+    reducer: ops.Reducer, expected: list[ops.TRow]
+) -> None:
+    rows = [
+        {"doc_id": 1, "text": "a", "value": 1},
+        {"doc_id": 1, "text": "b", "value": 2},
+        {"doc_id": 1, "text": "a", "value": 3},
+    ]
+    assert list(reducer(("doc_id",), rows)) == expected
+    assert list(reducer(("doc_id",), [])) == []
+
+
+def test_join_numeric_keys() -> None:
+    rows_a = [{"id": 9, "a": 1}, {"id": 10, "a": 2}]
+    rows_b = [{"id": 9, "b": 3}, {"id": 10, "b": 4}]
+    result = ops.Join(ops.InnerJoiner(), ["id"])(iter(rows_a), iter(rows_b))
+    assert list(result) == [{"id": 9, "a": 1, "b": 3}, {"id": 10, "a": 2, "b": 4}]
+
+
+@pytest.mark.parametrize("value", [["20171020T112238"], {"at": "20171020T112238"}, 1])
+def test_timestamp_mappers_skip_non_strings(value: tp.Any) -> None:
+    row = {"start": value, "end": value}
+    assert list(ops.Hour("start", "hour")(dict(row))) == [row]
+    assert list(ops.Weekday("start", "weekday")(dict(row))) == [row]
+    assert list(ops.TimeDifference("start", "end", "td")(dict(row))) == [row]
+
+
+def test_time_difference_mixed_formats() -> None:
+    row = {"start": "20171020T1122", "end": "20171024T144101.879000"}
+    result = list(ops.TimeDifference("start", "end", "td")(row))
+    assert result == [{**row, "td": pytest.approx(358739.879)}]
+
+
+def test_logarithm_outside_domain() -> None:
+    rows: list[ops.TRow] = [{"value": 1.0}, {"value": 0}, {"value": -1.0}]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        result = list(ops.Map(ops.Logarithm("value", "log"))(iter(rows)))
+    assert [row["log"] for row in result[:2]] == [0.0, -math.inf]
+    assert math.isnan(result[2]["log"])
+
+
+@pytest.mark.parametrize("joiner", [ops.InnerJoiner(), ops.OuterJoiner()])
+def test_chained_join_suffix_clash(joiner: ops.Joiner) -> None:
+    tables = [[{"id": 1, "e": name, "m": name.upper()}] for name in "abcd"]
+    result = tables[0]
+    for table in tables[1:]:
+        result = list(ops.Join(joiner, ["id"])(iter(result), iter(table)))
+    # columns suffixed by the first join overwrite the suffixed clashing ones
+    assert result == [{"id": 1, "e_1": "a", "e_2": "b", "m_1": "A", "m_2": "B"}]